@@ -2,12 +2,25 @@
 """
 构建脚本
 使用 PyInstaller 将应用打包为可执行文件
+
+可重入约定：
+本模块在导入时只定义常量和函数，不产生任何副作用，构建流程只通过 main() 触发。
+precompile_sources() 中的 compileall(workers=0) 等并行步骤会派生子进程，
+在 Windows/macOS 的 spawn 模式下子进程会重新导入本模块，
+因此任何构建步骤都不能放在 `if __name__ == "__main__":` 之外。
 """
 
 import os
 import sys
+import argparse
+import multiprocessing
 import shutil
+import compileall
+import hashlib
+import io
+import logging
 import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
 # 项目信息
@@ -20,40 +33,311 @@ SCRIPT_DIR = Path(__file__).parent
 DIST_DIR = SCRIPT_DIR / "dist"
 BUILD_DIR = SCRIPT_DIR / "build"
 SPEC_FILE = SCRIPT_DIR / f"{PROJECT_NAME}.spec"
+REQUIREMENTS_FILE = SCRIPT_DIR / "requirements.txt"
+BUILD_CACHE_DIR = SCRIPT_DIR / ".build-cache"
+PIP_CACHE_DIR = BUILD_CACHE_DIR / "pip"
+
+# 依赖安装方式: 未设置时跳过安装，"pip" 使用 pip，"uv" 使用 uv pip（并行解析和下载）
+INSTALL_DEPS = os.environ.get("PACKY_BUILD_INSTALL_DEPS", "").strip().lower()
+
+logger = logging.getLogger("build")
+_log_stream = None
+
+def setup_logging():
+    """
+    配置构建日志：输出写入带缓冲的 stdout 包装，不按行刷新，
+    由 flush_log() 在每个阶段结束时统一刷新，减少逐行 print 的系统调用开销
+    """
+    global _log_stream
+    if _log_stream is not None:
+        return
+    
+    # 持有包装对象的引用，避免被回收时连带关闭 sys.stdout.buffer
+    _log_stream = io.TextIOWrapper(
+        sys.stdout.buffer,
+        encoding=sys.stdout.encoding or "utf-8",
+        errors="replace",
+        line_buffering=False,
+        write_through=False
+    )
+    handler = logging.StreamHandler(_log_stream)
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+def flush_log():
+    """刷新构建日志缓冲"""
+    for handler in logger.handlers:
+        handler.flush()
+
+def run_streaming(cmd, cwd=None, env=None, prefix=""):
+    """
+    运行子进程并逐行转发其输出，避免长时间无输出看起来像卡死
+    
+    Args:
+        cmd: 命令参数列表
+        cwd: 工作目录
+        env: 额外的环境变量
+        prefix: 每行输出的前缀（并行构建时用于区分来源）
+    """
+    full_env = {
+        **os.environ,
+        "PYTHONUNBUFFERED": "1",
+        "PIP_PROGRESS_BAR": "on",
+        **(env or {})
+    }
+    
+    # 先刷出已缓冲的日志，保证与子进程输出的先后顺序一致
+    flush_log()
+    
+    process = subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        cwd=cwd,
+        env=full_env,
+        bufsize=1,
+        text=True,
+        encoding="utf-8",
+        errors="replace"
+    )
+    
+    for line in process.stdout:
+        sys.stdout.write(prefix + line)
+        sys.stdout.flush()
+    
+    returncode = process.wait()
+    if returncode != 0:
+        raise subprocess.CalledProcessError(returncode, cmd)
+
+def write_if_changed(path, content):
+    """
+    仅在内容变化时写入文件，保留未变化文件的 mtime，
+    使 PyInstaller 的增量缓存不会因为重写相同内容而失效
+    
+    Returns:
+        bool: 是否实际写入了文件
+    """
+    path = Path(path)
+    new = content.encode('utf-8')
+    old = path.read_bytes() if path.exists() else None
+    
+    if new == old:
+        return False
+    
+    path.write_bytes(new)
+    return True
+
+def _scandir_rmtree(path):
+    """基于 os.scandir 的纯 Python 递归删除"""
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                _scandir_rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+    os.rmdir(path)
+
+def fast_rmtree(path):
+    """
+    快速删除目录树
+    
+    优先调用系统命令（POSIX: rm -rf，Windows: rmdir /S /Q），
+    失败时回退到 os.scandir 实现，并行删除顶层子目录
+    """
+    path = Path(path)
+    
+    if sys.platform == 'win32':
+        cmd = ['cmd', '/c', 'rmdir', '/S', '/Q', str(path)]
+    else:
+        cmd = ['rm', '-rf', str(path)]
+    
+    try:
+        subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        if not path.exists():
+            return
+    except (OSError, subprocess.CalledProcessError):
+        pass
+    
+    # 回退实现：顶层子目录交给线程池并发删除，内核可以并行处理 unlink
+    with os.scandir(path) as entries:
+        top_level = list(entries)
+    
+    subdirs = [entry.path for entry in top_level if entry.is_dir(follow_symlinks=False)]
+    for entry in top_level:
+        if not entry.is_dir(follow_symlinks=False):
+            os.unlink(entry.path)
+    
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(_scandir_rmtree, subdirs))
+    
+    os.rmdir(path)
 
-def clean_build():
-    """清理构建目录"""
-    print("🧹 Cleaning build directories...")
+def clean_build(full_clean=False):
+    """
+    清理构建目录
+    
+    默认只清理 dist/，保留 build/ 和 spec 文件供 PyInstaller 增量构建复用；
+    full_clean 时一并删除
+    """
+    logger.info("🧹 Cleaning build directories...")
     
-    for dir_path in [DIST_DIR, BUILD_DIR]:
+    dir_paths = [DIST_DIR, BUILD_DIR] if full_clean else [DIST_DIR]
+    for dir_path in dir_paths:
         if dir_path.exists():
-            shutil.rmtree(dir_path)
-            print(f"   Removed {dir_path}")
+            fast_rmtree(dir_path)
+            logger.info("   Removed %s", dir_path)
     
-    if SPEC_FILE.exists():
+    if full_clean and SPEC_FILE.exists():
         SPEC_FILE.unlink()
-        print(f"   Removed {SPEC_FILE}")
+        logger.info("   Removed %s", SPEC_FILE)
 
-def install_dependencies():
-    """安装依赖"""
-    print("📦 Installing dependencies...")
+def _venv_python(venv_dir):
+    """返回虚拟环境中的 Python 解释器路径"""
+    if sys.platform == 'win32':
+        return venv_dir / "Scripts" / "python.exe"
+    return venv_dir / "bin" / "python"
 
-    # 跳过依赖安装，假设依赖已经安装
-    print("   ⏭️ Skipping dependency installation (assuming already installed)")
+def _pip_install_command(python):
+    """构造安装 requirements.txt 的命令"""
+    if INSTALL_DEPS == "uv" and shutil.which("uv"):
+        cmd = ["uv", "pip", "install", "--python", str(python)]
+    else:
+        if INSTALL_DEPS == "uv":
+            logger.warning("   ⚠️ uv not found, falling back to pip")
+        cmd = [str(python), "-m", "pip", "install", "--cache-dir", str(PIP_CACHE_DIR)]
+    
+    # 只有在 requirements.txt 带哈希时才能启用哈希校验
+    if "--hash" in REQUIREMENTS_FILE.read_text(encoding='utf-8'):
+        cmd.append("--require-hashes")
+    
+    return cmd + ["-r", str(REQUIREMENTS_FILE)]
 
-    # 验证关键依赖是否可用
-    try:
-        import click
-        import pystray
-        print("   ✅ Core dependencies verified")
-    except ImportError as e:
-        print(f"   ❌ Missing core dependency: {e}")
-        print("   💡 Please manually install: pip install click pystray")
-        sys.exit(1)
+def install_dependencies():
+    """
+    安装依赖
+    
+    依赖安装到以 requirements.txt 哈希为键的虚拟环境中，
+    requirements.txt 未变化时直接复用，跳过 pip 步骤
+    
+    Returns:
+        用于后续构建的 Python 解释器路径
+    """
+    logger.info("📦 Installing dependencies...")
+
+    if INSTALL_DEPS not in ("pip", "uv"):
+        # 默认跳过依赖安装，假设依赖已经安装
+        logger.info("   ⏭️ Skipping dependency installation (assuming already installed)")
+        
+        # 验证关键依赖是否可用
+        try:
+            import click
+            import pystray
+            logger.info("   ✅ Core dependencies verified")
+        except ImportError as e:
+            logger.error("   ❌ Missing core dependency: %s", e)
+            logger.info("   💡 Please manually install: pip install click pystray")
+            sys.exit(1)
+        
+        return Path(sys.executable)
+
+    deps_hash = hashlib.sha256(REQUIREMENTS_FILE.read_bytes()).hexdigest()
+    cache_dir = BUILD_CACHE_DIR / deps_hash
+    venv_dir = cache_dir / "venv"
+    stamp_file = cache_dir / "installed.stamp"
+    python = _venv_python(venv_dir)
+
+    if stamp_file.exists() and python.exists():
+        logger.info("   ⏭️ Dependencies up to date (cache %s)", deps_hash[:12])
+        return python
+
+    logger.info("   Creating build environment: %s", venv_dir)
+    run_streaming([sys.executable, "-m", "venv", str(venv_dir)], cwd=SCRIPT_DIR)
+    run_streaming(_pip_install_command(python), cwd=SCRIPT_DIR)
+    run_streaming([str(python), "-m", "pip", "install", "--cache-dir", str(PIP_CACHE_DIR), "pyinstaller"],
+                  cwd=SCRIPT_DIR)
+
+    stamp_file.write_text(deps_hash, encoding='utf-8')
+    logger.info("   ✅ Dependencies installed")
+    return python
+
+# 各平台的 pystray / plyer 后端模块
+PYSTRAY_BACKENDS = {
+    'win32': ['pystray._win32'],
+    'darwin': ['pystray._darwin'],
+    'linux': ['pystray._gtk', 'pystray._appindicator', 'pystray._xorg'],
+}
+PLYER_NOTIFICATION_BACKENDS = {
+    'win32': ['plyer.platforms.win.notification'],
+    'darwin': ['plyer.platforms.macosx.notification'],
+    'linux': ['plyer.platforms.linux.notification'],
+}
+
+# 运行时从不使用、却会被 Analysis 递归扫描打包的标准库模块
+COMMON_EXCLUDES = [
+    'tkinter',
+    'unittest',
+    'pydoc',
+    'test',
+    'setuptools',
+    'distutils',
+    'email.test',
+    'xmlrpc',
+]
+
+def _current_platform():
+    """返回 PYSTRAY_BACKENDS 使用的平台键"""
+    if sys.platform == 'win32':
+        return 'win32'
+    if sys.platform == 'darwin':
+        return 'darwin'
+    return 'linux'
+
+def get_platform_spec_options():
+    """
+    生成当前平台的 spec 选项
+    
+    仅打包当前平台的托盘/通知后端并排除其余后端，缩小 Analysis 依赖图；
+    onefile 模式下 UPX 只在 Windows 启用（macOS/Linux 上会导致自解压启动问题）
+    """
+    current = _current_platform()
+    
+    # tkinter 已被排除，因此不再打包 PIL._tkinter_finder
+    hiddenimports = PYSTRAY_BACKENDS[current] + [
+        'keyring.backends',
+        # plyer 平台特定模块（用于桌面通知）
+        *PLYER_NOTIFICATION_BACKENDS[current],
+        'plyer.platforms',
+    ]
+    
+    excludes = list(COMMON_EXCLUDES)
+    for platform_key in PYSTRAY_BACKENDS:
+        if platform_key != current:
+            excludes += PYSTRAY_BACKENDS[platform_key]
+            excludes += PLYER_NOTIFICATION_BACKENDS[platform_key]
+    
+    return {
+        'hiddenimports': hiddenimports,
+        'excludes': excludes,
+        'strip': current == 'linux',
+        'upx': current == 'win32',
+        'upx_exclude': ['vcruntime140.dll', 'python3*.dll'] if current == 'win32' else [],
+    }
+
+def _format_spec_list(items, indent=8):
+    """将列表格式化为 spec 文件中的多行列表字面量"""
+    if not items:
+        return "[]"
+    pad = " " * indent
+    lines = "".join(f"{pad}{item!r},\n" for item in items)
+    return f"[\n{lines}{pad[:-4]}]"
 
 def create_pyinstaller_spec():
     """创建 PyInstaller 配置文件"""
-    print("📝 Creating PyInstaller spec file...")
+    logger.info("📝 Creating PyInstaller spec file...")
+    
+    options = get_platform_spec_options()
     
     spec_content = f'''# -*- mode: python ; coding: utf-8 -*-
 
@@ -64,22 +348,11 @@ a = Analysis(
     pathex=['{SCRIPT_DIR}'],
     binaries=[],
     datas=[],
-    hiddenimports=[
-        'pystray._win32',
-        'pystray._darwin',
-        'pystray._gtk',
-        'PIL._tkinter_finder',
-        'keyring.backends',
-        # plyer 平台特定模块（用于桌面通知）
-        'plyer.platforms.win.notification',
-        'plyer.platforms.linux.notification',
-        'plyer.platforms.macosx.notification',
-        'plyer.platforms',
-    ],
+    hiddenimports={_format_spec_list(options['hiddenimports'])},
     hookspath=[],
     hooksconfig={{}},
     runtime_hooks=[],
-    excludes=[],
+    excludes={_format_spec_list(options['excludes'])},
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
@@ -98,9 +371,9 @@ exe = EXE(
     name='{PROJECT_NAME}',
     debug=False,
     bootloader_ignore_signals=False,
-    strip=False,
-    upx=True,
-    upx_exclude=[],
+    strip={options['strip']},
+    upx={options['upx']},
+    upx_exclude={_format_spec_list(options['upx_exclude'])},
     runtime_tmpdir=None,
     console=True,  # 保留控制台，便于调试和命令行使用
     disable_windowed_traceback=False,
@@ -111,17 +384,17 @@ exe = EXE(
 )
 '''
     
-    with open(SPEC_FILE, 'w', encoding='utf-8') as f:
-        f.write(spec_content)
-    
-    print(f"   ✅ Spec file created: {SPEC_FILE}")
+    if write_if_changed(SPEC_FILE, spec_content):
+        logger.info("   ✅ Spec file created: %s", SPEC_FILE)
+    else:
+        logger.info("   ⏭️ Spec file unchanged: %s", SPEC_FILE)
 
 def create_version_info():
     """创建版本信息文件 (Windows)"""
     if sys.platform != 'win32':
         return
     
-    print("📄 Creating version info file...")
+    logger.info("📄 Creating version info file...")
     
     version_info = f'''VSVersionInfo(
   ffi=FixedFileInfo(
@@ -151,32 +424,96 @@ def create_version_info():
   ]
 )'''
     
-    with open('version_info.txt', 'w', encoding='utf-8') as f:
-        f.write(version_info)
+    if write_if_changed('version_info.txt', version_info):
+        logger.info("   ✅ Version info file created")
+    else:
+        logger.info("   ⏭️ Version info file unchanged")
+
+def default_build_targets():
+    """默认构建目标列表: (spec 文件, workpath, distpath)"""
+    return [(SPEC_FILE, BUILD_DIR, DIST_DIR)]
+
+def precompile_sources():
+    """预编译项目源码，让 PyInstaller Analysis 直接复用 __pycache__"""
+    logger.info("⚙️  Precompiling sources...")
+    
+    ok = compileall.compile_dir(
+        str(SCRIPT_DIR / "packy_usage"),
+        quiet=1,
+        workers=0  # 0 表示使用全部 CPU 核心
+    )
     
-    print("   ✅ Version info file created")
+    if ok:
+        logger.info("   ✅ Sources precompiled")
+    else:
+        logger.warning("   ⚠️ Some sources failed to precompile, PyInstaller will compile them itself")
 
-def build_executable():
-    """构建可执行文件"""
-    print("🔨 Building executable...")
+def _run_pyinstaller(index, spec, workpath, distpath, python, clean=False, prefix=""):
+    """运行单个 PyInstaller 构建任务"""
+    # 每个任务使用独立且固定的 PYINSTALLER_CONFIG_DIR：并行构建时缓存互不破坏，
+    # 多次构建之间复用同一目标的 bincache，也不会在临时目录中残留
+    config_dir = BUILD_CACHE_DIR / f"pyi-config-{index}"
     
-    try:
-        # 使用 PyInstaller 构建
-        subprocess.run([
-            sys.executable, "-m", "PyInstaller", 
-            "--clean",
-            str(SPEC_FILE)
-        ], check=True, cwd=SCRIPT_DIR)
-        
-        print("   ✅ Build completed successfully")
+    cmd = [str(python), "-m", "PyInstaller"]
+    if clean:
+        # --clean 会丢弃 workpath 中的 Analysis 缓存，仅在完全清理时使用
+        cmd.append("--clean")
+    cmd += [
+        "--workpath", str(workpath),
+        "--distpath", str(distpath),
+        str(spec)
+    ]
+    
+    run_streaming(cmd, cwd=SCRIPT_DIR, env={"PYINSTALLER_CONFIG_DIR": str(config_dir)}, prefix=prefix)
+    
+    return spec
+
+def build_executable(targets=None, python=None, clean=False):
+    """
+    构建可执行文件
+    
+    Args:
+        targets: (spec, workpath, distpath) 元组列表，多个目标时并行构建
+        python: 运行 PyInstaller 的解释器，默认为当前解释器
+        clean: 是否让 PyInstaller 丢弃缓存重新分析
+    """
+    logger.info("🔨 Building executable...")
+    
+    targets = targets or default_build_targets()
+    python = python or Path(sys.executable)
+    precompile_sources()
+    
+    # 每个 PyInstaller 进程自身就是 CPU 密集的子进程，线程池只负责等待
+    max_workers = min(len(targets), os.cpu_count() or 1)
+    failed = []
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _run_pyinstaller, i, spec, workpath, distpath, python, clean,
+                # 多个目标并行时给输出加上目标名前缀
+                f"[{Path(spec).stem}] " if len(targets) > 1 else ""
+            ): spec
+            for i, (spec, workpath, distpath) in enumerate(targets)
+        }
         
-    except subprocess.CalledProcessError as e:
-        print(f"   ❌ Build failed: {e}")
+        for future in as_completed(futures):
+            spec = futures[future]
+            try:
+                future.result()
+                logger.info("   ✅ Built %s", Path(spec).name)
+            except subprocess.CalledProcessError as e:
+                logger.error("   ❌ Build failed for %s: %s", Path(spec).name, e)
+                failed.append(spec)
+    
+    if failed:
         sys.exit(1)
+    
+    logger.info("   ✅ Build completed successfully")
 
 def create_installer_scripts():
     """创建安装脚本"""
-    print("📦 Creating installer scripts...")
+    logger.info("📦 Creating installer scripts...")
     
     # Windows 批处理安装脚本
     if sys.platform == 'win32':
@@ -233,11 +570,11 @@ echo "You can now run '{PROJECT_NAME}' from anywhere"
         # 设置可执行权限
         os.chmod(install_script, 0o755)
     
-    print("   ✅ Installer scripts created")
+    logger.info("   ✅ Installer scripts created")
 
 def create_readme():
     """创建发布README"""
-    print("📋 Creating release README...")
+    logger.info("📋 Creating release README...")
     
     readme_content = f'''# {PROJECT_NAME} v{VERSION}
 
@@ -325,67 +662,96 @@ def create_readme():
 - 文档: https://docs.packycode.com
 '''
     
-    with open(DIST_DIR / "README.md", 'w', encoding='utf-8') as f:
-        f.write(readme_content)
-    
-    print("   ✅ Release README created")
+    if write_if_changed(DIST_DIR / "README.md", readme_content):
+        logger.info("   ✅ Release README created")
+    else:
+        logger.info("   ⏭️ Release README unchanged")
 
 def print_build_summary():
     """打印构建摘要"""
-    print("\n" + "="*50)
-    print("🎉 BUILD COMPLETED SUCCESSFULLY!")
-    print("="*50)
+    logger.info("\n%s", "=" * 50)
+    logger.info("🎉 BUILD COMPLETED SUCCESSFULLY!")
+    logger.info("=" * 50)
     
     exe_name = f"{PROJECT_NAME}.exe" if sys.platform == 'win32' else PROJECT_NAME
     exe_path = DIST_DIR / exe_name
     
     if exe_path.exists():
         size = exe_path.stat().st_size / (1024 * 1024)  # MB
-        print(f"📦 Executable: {exe_path}")
-        print(f"📏 Size: {size:.1f} MB")
+        logger.info("📦 Executable: %s", exe_path)
+        logger.info("📏 Size: %.1f MB", size)
     
-    print(f"📂 Output directory: {DIST_DIR}")
-    print("\n🚀 Quick start:")
-    print(f"   cd {DIST_DIR}")
-    print(f"   ./{exe_name} --help")
+    logger.info("📂 Output directory: %s", DIST_DIR)
+    logger.info("\n🚀 Quick start:")
+    logger.info("   cd %s", DIST_DIR)
+    logger.info("   ./%s --help", exe_name)
     
-    print("\n💡 Next steps:")
-    print("   1. Test the executable")
-    print("   2. Run installer script for system-wide installation")
-    print("   3. Configure API Token")
-
-def main():
+    logger.info("\n💡 Next steps:")
+    logger.info("   1. Test the executable")
+    logger.info("   2. Run installer script for system-wide installation")
+    logger.info("   3. Configure API Token")
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description=f"Build {PROJECT_NAME} with PyInstaller")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="skip the clean step entirely and reuse previous build outputs"
+    )
+    parser.add_argument(
+        "--full-clean",
+        action="store_true",
+        help="also remove build/ and the spec file, and run PyInstaller with --clean"
+    )
+    return parser.parse_args(argv)
+
+def main(argv=None):
     """主构建流程"""
-    print(f"🚀 Building {PROJECT_NAME} v{VERSION}")
-    print("="*50)
+    args = parse_args(argv)
+    setup_logging()
+    
+    logger.info("🚀 Building %s v%s", PROJECT_NAME, VERSION)
+    logger.info("=" * 50)
     
     try:
         # 1. 清理
-        clean_build()
+        if args.incremental:
+            logger.info("⏭️ Incremental build, skipping clean step")
+        else:
+            clean_build(full_clean=args.full_clean)
+        flush_log()
         
         # 2. 安装依赖
-        install_dependencies()
+        python = install_dependencies()
+        flush_log()
         
         # 3. 创建构建文件
         create_version_info()
         create_pyinstaller_spec()
+        flush_log()
         
         # 4. 构建
-        build_executable()
+        build_executable(python=python, clean=args.full_clean)
+        flush_log()
         
         # 5. 创建附加文件
         create_installer_scripts()
         create_readme()
+        flush_log()
         
         # 6. 完成摘要
         print_build_summary()
         
     except KeyboardInterrupt:
-        print("\n❌ Build cancelled by user")
+        logger.error("\n❌ Build cancelled by user")
         sys.exit(1)
     except Exception as e:
-        print(f"\n❌ Build failed: {e}")
+        logger.error("\n❌ Build failed: %s", e)
         sys.exit(1)
+    finally:
+        flush_log()
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
@@ -4,14 +4,32 @@ Packy Usage Monitor - 独立预算监控工具
 """
 
 import sys
-import click
-from pathlib import Path
+import multiprocessing
 
-# 添加项目根目录到 Python 路径
-sys.path.insert(0, str(Path(__file__).parent))
+# 冻结（PyInstaller）构建中，multiprocessing 以 spawn 方式启动的子进程会重新执行入口脚本，
+# 必须在其他导入之前调用 freeze_support()，否则子进程会再次进入 CLI，导致递归派生进程
+if getattr(sys, 'frozen', False):
+    multiprocessing.freeze_support()
 
+# 直接运行脚本时其所在目录已位于 sys.path[0]，无需再手动插入
 from packy_usage.cli.commands import cli
 
+# 冻结程序派生子进程时可能附带的解释器参数，CLI 无法识别
+_INTERPRETER_FLAGS = {'-B', '-S', '-I', '-E', '-s', '-O', '-OO'}
+
+
+def _sanitize_argv():
+    """移除冻结程序被当作解释器调用时传入的解释器参数"""
+    args = sys.argv[1:]
+    while args and args[0] in _INTERPRETER_FLAGS:
+        args.pop(0)
+    sys.argv[1:] = args
+
 
 if __name__ == "__main__":
-    cli()
\ No newline at end of file
+    multiprocessing.freeze_support()
+    if getattr(sys, 'frozen', False):
+        # 各平台统一使用 spawn，行为与 Windows/macOS 一致
+        multiprocessing.set_start_method('spawn', force=True)
+        _sanitize_argv()
+    cli()
@@ -8,8 +8,25 @@ __version__ = "1.0.0"
 __author__ = "Packy Usage Team"
 __email__ = "support@packycode.com"
 
-from .core.api_client import ApiClient
-from .core.budget_data import BudgetData
-from .config.manager import ConfigManager
+__all__ = ["ApiClient", "BudgetData", "ConfigManager"]
 
-__all__ = ["ApiClient", "BudgetData", "ConfigManager"]
\ No newline at end of file
+# 公开类按需导入（PEP 562），避免导入包时就加载 requests、aiohttp、keyring 等依赖
+_LAZY_EXPORTS = {
+    "ApiClient": ".core.api_client",
+    "BudgetData": ".core.budget_data",
+    "ConfigManager": ".config.manager",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        import importlib
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY_EXPORTS))
@@ -4,28 +4,68 @@
 
 import click
 import sys
+import importlib
 from pathlib import Path
 
 from ..config.manager import ConfigManager
-from ..core.api_client import ApiClient
-from ..security.token_manager import TokenManager
-from ..ui.tray_app import TrayApp
-from ..ui.cli_display import CliDisplay
-from ..utils.logger import setup_logger
+from ..utils.logger import get_logger
 
-# 导入调度器命令
-from .scheduler_commands import scheduler
-# 导入状态管理命令
-from .state_commands import state
+# 重量级依赖（pystray、PIL、keyring、requests、plyer 等）均在子命令内部按需导入，
+# 避免 --version、config show 等轻量命令承担无关的导入开销
 
+logger = get_logger(__name__)
 
-@click.group(invoke_without_command=True)
+
+class LazyGroup(click.Group):
+    """
+    按需加载子命令模块的命令组
+    
+    lazy_subcommands 形如 {"命令名": "模块路径:属性名"}，
+    仅在解析到对应命令时才导入其所在模块
+    """
+    
+    def __init__(self, *args, lazy_subcommands: dict = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.lazy_subcommands = lazy_subcommands or {}
+    
+    def list_commands(self, ctx):
+        return sorted(set(super().list_commands(ctx)) | set(self.lazy_subcommands))
+    
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            return self._load_lazy_command(cmd_name)
+        return super().get_command(ctx, cmd_name)
+    
+    def _load_lazy_command(self, cmd_name: str):
+        """导入并返回延迟注册的子命令，模块不可用时返回 None"""
+        module_name, attr_name = self.lazy_subcommands[cmd_name].rsplit(':', 1)
+        try:
+            module = importlib.import_module(module_name)
+        except ImportError as e:
+            logger.debug(f"无法加载子命令 '{cmd_name}': {e}")
+            return None
+        return getattr(module, attr_name)
+
+
+@click.group(
+    cls=LazyGroup,
+    invoke_without_command=True,
+    lazy_subcommands={
+        # 调度器命令
+        'scheduler': 'packy_usage.cli.scheduler_commands:scheduler',
+        # 状态管理命令
+        'state': 'packy_usage.cli.state_commands:state',
+    }
+)
 @click.option('--version', is_flag=True, help='显示版本信息')
 @click.option('--config-dir', help='指定配置目录路径')
 @click.pass_context
 def cli(ctx, version, config_dir):
     """Packy Usage Monitor - 预算监控工具"""
     
+    # 子命令共享的服务对象（ConfigManager/TokenManager/ApiClient）按需创建并缓存在这里
+    ctx.ensure_object(dict)
+    
     if version:
         from .. import __version__
         click.echo(f"Packy Usage Monitor v{__version__}")
@@ -40,13 +80,47 @@ def cli(ctx, version, config_dir):
         click.echo(ctx.get_help())
 
 
+def _get_config(ctx: click.Context):
+    """获取当前命令上下文共享的 ConfigManager（按需创建）"""
+    services = ctx.ensure_object(dict)
+    if 'config' not in services:
+        services['config'] = ConfigManager()
+    return services['config']
+
+
+def _get_token_manager(ctx: click.Context):
+    """获取当前命令上下文共享的 TokenManager（按需创建）"""
+    services = ctx.ensure_object(dict)
+    if 'token_manager' not in services:
+        from ..security.token_manager import TokenManager
+        services['token_manager'] = TokenManager()
+    return services['token_manager']
+
+
+def _get_api_client(ctx: click.Context):
+    """获取当前命令上下文共享的 ApiClient（按需创建）"""
+    services = ctx.ensure_object(dict)
+    if 'api_client' not in services:
+        from ..core.api_client import ApiClient
+        services['api_client'] = ApiClient(_get_config(ctx), _get_token_manager(ctx))
+    return services['api_client']
+
+
+def _get_services(ctx: click.Context):
+    """获取 (ConfigManager, TokenManager, ApiClient) 三元组"""
+    return _get_config(ctx), _get_token_manager(ctx), _get_api_client(ctx)
+
+
 @cli.command()
 @click.option('--brief', '-b', is_flag=True, help='简要显示')
 @click.option('--json', 'output_json', is_flag=True, help='JSON格式输出')
 @click.option('--alert-only', is_flag=True, help='仅显示警告状态')
 @click.option('--debug', is_flag=True, help='启用详细调试信息')
-def status(brief, output_json, alert_only, debug):
+@click.pass_context
+def status(ctx, brief, output_json, alert_only, debug):
     """显示当前预算使用状态"""
+    from ..ui.cli_display import CliDisplay
+
     try:
         # 如果启用调试模式，设置详细日志
         if debug:
@@ -54,9 +128,7 @@ def status(brief, output_json, alert_only, debug):
             logging.basicConfig(level=logging.DEBUG, format='%(levelname)s - %(message)s')
             click.echo("🐛 调试模式已启用")
         
-        config = ConfigManager()
-        token_manager = TokenManager()
-        api_client = ApiClient(config, token_manager)
+        config, token_manager, api_client = _get_services(ctx)
         
         # 调试信息输出
         if debug:
@@ -86,12 +158,13 @@ def status(brief, output_json, alert_only, debug):
 
 @cli.command()
 @click.option('--interval', '-i', default=30, help='轮询间隔（秒）')
-def watch(interval):
+@click.pass_context
+def watch(ctx, interval):
     """实时监控模式"""
+    from ..ui.cli_display import CliDisplay
+
     try:
-        config = ConfigManager()
-        token_manager = TokenManager()
-        api_client = ApiClient(config, token_manager)
+        config, token_manager, api_client = _get_services(ctx)
         display = CliDisplay()
         
         click.echo(">> 启动实时监控模式 (Ctrl+C 退出)")
@@ -106,8 +179,11 @@ def watch(interval):
 
 @cli.command()
 @click.option('--debug', is_flag=True, help='启用调试模式')
-def tray(debug):
+@click.pass_context
+def tray(ctx, debug):
     """启动系统托盘应用"""
+    from ..ui.tray_app import TrayApp
+
     try:
         # 如果启用调试模式，设置详细日志
         if debug:
@@ -115,9 +191,7 @@ def tray(debug):
             logging.basicConfig(level=logging.DEBUG, format='%(levelname)s - %(name)s - %(message)s')
             click.echo("🐛 调试模式已启用")
         
-        config = ConfigManager()
-        token_manager = TokenManager()
-        api_client = ApiClient(config, token_manager)
+        config, token_manager, api_client = _get_services(ctx)
         
         # 调试信息输出
         if debug:
@@ -170,20 +244,22 @@ def config():
 
 
 @config.command('show')
-def config_show():
+@click.pass_context
+def config_show(ctx):
     """显示当前配置"""
     try:
-        config = ConfigManager()
+        config = _get_config(ctx)
         config.show_config()
     except Exception as e:
         click.echo(f"❌ 错误: {e}", err=True)
 
 
 @config.command('set-token')
-def config_set_token():
+@click.pass_context
+def config_set_token(ctx):
     """设置 API Token"""
     try:
-        token_manager = TokenManager()
+        token_manager = _get_token_manager(ctx)
         
         click.echo("📝 配置 API Token")
         click.echo("支持的 Token 类型：")
@@ -222,22 +298,39 @@ def config_set_token():
         click.echo(f"❌ 保存失败: {e}", err=True)
 
 
+def _is_module_available(name: str) -> bool:
+    """
+    检查模块是否可用（实际执行导入）
+    
+    已安装但导入时失败的模块同样视为不可用，例如无图形界面的 Linux 上
+    pystray 导入时会因无法连接显示服务器抛出 DisplayNameError
+    """
+    try:
+        importlib.import_module(name)
+        return True
+    except Exception:
+        return False
+
+
 @cli.command()
-def diagnose():
+@click.pass_context
+def diagnose(ctx):
     """运行系统诊断检查"""
+    from concurrent.futures import ThreadPoolExecutor
+
     click.echo("🔍 Packy Usage Monitor 系统诊断")
     click.echo("=" * 50)
     
     try:
         # 1. 检查配置
         click.echo("1️⃣ 检查配置文件...")
-        config = ConfigManager()
+        config = _get_config(ctx)
         click.echo(f"   ✅ 配置文件: {config.config_directory}/config.yaml")
         click.echo(f"   ✅ API端点: {config.get_api_endpoint()}")
         
         # 2. 检查Token
         click.echo("\n2️⃣ 检查Token状态...")
-        token_manager = TokenManager()
+        token_manager = _get_token_manager(ctx)
         token_info = token_manager.get_token_info()
         
         if token_info:
@@ -251,22 +344,8 @@ def diagnose():
         
         # 3. 测试网络连接
         click.echo("\n3️⃣ 测试网络连接...")
-        api_client = ApiClient(config, token_manager)
+        api_client = _get_api_client(ctx)
         
-        if token_manager.is_token_available():
-            try:
-                test_result = api_client.test_connection_sync()
-                if test_result:
-                    click.echo("   ✅ API连接成功")
-                else:
-                    click.echo("   ❌ API连接失败")
-            except Exception as e:
-                click.echo(f"   ❌ 连接测试错误: {e}")
-        else:
-            click.echo("   ⚠️  跳过连接测试（无有效Token）")
-        
-        # 4. 检查依赖
-        click.echo("\n4️⃣ 检查依赖库...")
         dependencies = [
             ('requests', 'HTTP请求'),
             ('pystray', '系统托盘'),
@@ -277,12 +356,34 @@ def diagnose():
             ('PIL', '图像处理')
         ]
         
-        for dep, desc in dependencies:
-            try:
-                __import__(dep)
-                click.echo(f"   ✅ {dep}: {desc}")
-            except ImportError:
-                click.echo(f"   ❌ {dep}: {desc} - 未安装")
+        # 连接测试与依赖检查互不依赖，并发执行；结果仍按原顺序输出
+        with ThreadPoolExecutor(max_workers=len(dependencies) + 1) as executor:
+            connection_future = None
+            if token_manager.is_token_available():
+                connection_future = executor.submit(api_client.test_connection_sync)
+            
+            dependency_results = executor.map(
+                _is_module_available, [dep for dep, _ in dependencies]
+            )
+            
+            if connection_future:
+                try:
+                    if connection_future.result():
+                        click.echo("   ✅ API连接成功")
+                    else:
+                        click.echo("   ❌ API连接失败")
+                except Exception as e:
+                    click.echo(f"   ❌ 连接测试错误: {e}")
+            else:
+                click.echo("   ⚠️  跳过连接测试（无有效Token）")
+            
+            # 4. 检查依赖
+            click.echo("\n4️⃣ 检查依赖库...")
+            for (dep, desc), available in zip(dependencies, dependency_results):
+                if available:
+                    click.echo(f"   ✅ {dep}: {desc}")
+                else:
+                    click.echo(f"   ❌ {dep}: {desc} - 未安装或无法导入")
 
         # 5. 测试通知系统
         click.echo("\n5️⃣ 测试通知系统...")
@@ -313,57 +414,67 @@ def diagnose():
 @cli.command()
 @click.option('--iterations', '-n', default=10, help='测试迭代次数')
 @click.option('--cached/--no-cached', default=True, help='是否使用缓存')
-def perf_test(iterations, cached):
-    """性能测试 - 测试连接池和缓存优化效果"""
+@click.pass_context
+def perf_test(ctx, iterations, cached):
+    """性能测试 - 并发请求测试连接池和缓存优化效果"""
     import time
+    import asyncio
+    import statistics
     
     click.echo(">> Packy Usage Monitor 性能测试")
     click.echo("=" * 50)
     
     try:
-        config = ConfigManager()
-        token_manager = TokenManager()
-        api_client = ApiClient(config, token_manager)
+        config, token_manager, api_client = _get_services(ctx)
         
-        # 如果不使用缓存，清空缓存
+        # 如果不使用缓存，在并发请求开始前清空一次缓存，测试冷路径并发性能
         if not cached:
             api_client.clear_cache()
             click.echo("已清空缓存，测试无缓存性能")
         else:
             click.echo("使用缓存进行测试")
         
-        click.echo(f"测试参数: 迭代次数={iterations}, 缓存={cached}")
+        click.echo(f"测试参数: 并发请求数={iterations}, 缓存={cached}")
         click.echo()
         
+        async def timed_fetch():
+            """执行单次请求并返回 (耗时, 数据, 异常)"""
+            start_time = time.monotonic()
+            try:
+                data = await api_client.fetch_budget_data()
+                return time.monotonic() - start_time, data, None
+            except Exception as e:
+                return time.monotonic() - start_time, None, e
+        
+        async def run_concurrently():
+            """通过连接池并发发出所有请求"""
+            try:
+                return await asyncio.gather(*[timed_fetch() for _ in range(iterations)])
+            finally:
+                # 异步会话绑定在当前事件循环上，循环结束前关闭
+                await api_client.session_manager.close_async_session()
+        
         # 执行测试
+        wall_start = time.monotonic()
+        results = asyncio.run(run_concurrently())
+        wall_time = time.monotonic() - wall_start
+        
         times = []
-        for i in range(iterations):
-            start_time = time.time()
-            
-            try:
-                data = api_client.fetch_budget_data_sync()
-                elapsed = time.time() - start_time
+        for i, (elapsed, data, error) in enumerate(results):
+            if error is not None:
+                click.echo(f"[X] 第 {i+1}/{iterations} 次: {error}")
+            elif data:
                 times.append(elapsed)
-                
-                if data:
-                    status = f"[OK] 第 {i+1}/{iterations} 次: {elapsed:.3f}秒"
-                    if elapsed < 0.1:
-                        status += " (缓存命中)"
-                    click.echo(status)
-                else:
-                    click.echo(f"[!] 第 {i+1}/{iterations} 次: 无数据")
-                    
-            except Exception as e:
-                elapsed = time.time() - start_time
-                click.echo(f"[X] 第 {i+1}/{iterations} 次: {e}")
-            
-            # 如果不使用缓存，每次清空
-            if not cached:
-                api_client.clear_cache()
+                status = f"[OK] 第 {i+1}/{iterations} 次: {elapsed:.3f}秒"
+                if elapsed < 0.1:
+                    status += " (缓存命中)"
+                click.echo(status)
+            else:
+                click.echo(f"[!] 第 {i+1}/{iterations} 次: 无数据")
         
         # 统计结果
         if times:
-            avg_time = sum(times) / len(times)
+            avg_time = statistics.mean(times)
             min_time = min(times)
             max_time = max(times)
             
@@ -372,6 +483,11 @@ def perf_test(iterations, cached):
             click.echo(f"平均响应时间: {avg_time:.3f} 秒")
             click.echo(f"最快响应时间: {min_time:.3f} 秒")
             click.echo(f"最慢响应时间: {max_time:.3f} 秒")
+            if len(times) >= 2:
+                percentiles = statistics.quantiles(times, n=100)
+                click.echo(f"P50/P95/P99: {percentiles[49]:.3f} / {percentiles[94]:.3f} / {percentiles[98]:.3f} 秒")
+            click.echo(f"总耗时: {wall_time:.3f} 秒")
+            click.echo(f"吞吐量: {iterations / wall_time:.1f} 请求/秒")
             click.echo(f"成功率: {len(times)}/{iterations} ({len(times)*100/iterations:.1f}%)")
             
             # 显示连接池状态
@@ -402,10 +518,11 @@ def perf_test(iterations, cached):
 
 @config.command('reset')
 @click.confirmation_option(prompt='确定要重置所有配置吗？')
-def config_reset():
+@click.pass_context
+def config_reset(ctx):
     """重置配置为默认值"""
     try:
-        config = ConfigManager()
+        config = _get_config(ctx)
         config.reset_to_defaults()
         click.echo("✅ 配置已重置为默认值")
     except Exception as e:
@@ -414,12 +531,11 @@ def config_reset():
 
 @cli.command()
 @click.option('--threshold', default=90, help='预算使用率阈值（百分比）')
-def check(threshold):
+@click.pass_context
+def check(ctx, threshold):
     """检查预算状态（适用于CI/CD）"""
     try:
-        config = ConfigManager()
-        token_manager = TokenManager()
-        api_client = ApiClient(config, token_manager)
+        config, token_manager, api_client = _get_services(ctx)
 
         budget_data = api_client.fetch_budget_data_sync()
 
@@ -442,9 +558,3 @@ def check(threshold):
     except Exception as e:
         click.echo(f"❌ 检查失败: {e}", err=True)
         sys.exit(2)
-
-
-# 添加调度器命令组
-cli.add_command(scheduler)
-# 添加状态管理命令组
-cli.add_command(state)
\ No newline at end of file
@@ -4,11 +4,16 @@
 """
 
 import os
-import yaml
+import sys
+import copy
+import tempfile
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, Any, Optional
 from dataclasses import dataclass, asdict
 
+from .. import __version__
+from ..utils import json_codec
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -78,6 +83,48 @@ class LoggingConfig:
     backup_count: int = 5
 
 
+# 默认配置，导入时生成一次
+_DEFAULT_CONFIG: Dict[str, Any] = {
+    "api": asdict(ApiConfig()),
+    "polling": asdict(PollingConfig()),
+    "display": asdict(DisplayConfig()),
+    "alerts": asdict(AlertConfig()),
+    "notification": asdict(NotificationConfig()),
+    "network": asdict(NetworkConfig()),
+    "logging": asdict(LoggingConfig())
+}
+
+
+@lru_cache(maxsize=None)
+def _yaml_backend():
+    """
+    延迟导入 yaml，命中 JSON 缓存时无需加载
+    
+    Returns:
+        (yaml 模块, Loader, Dumper)，优先使用 libyaml 提供的 C 实现，
+        未编译 libyaml 时回退到纯 Python 版本
+    """
+    import yaml
+    try:
+        from yaml import CSafeLoader as Loader, CSafeDumper as Dumper
+    except ImportError:
+        from yaml import SafeLoader as Loader, SafeDumper as Dumper
+    return yaml, Loader, Dumper
+
+
+@lru_cache(maxsize=8)
+def _parse_config_file(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    解析配置文件
+    
+    以 (路径, 修改时间, 大小) 为键缓存解析结果，同一进程内重复创建
+    ConfigManager 时无需再次解析未变化的文件；调用方不得修改返回值
+    """
+    yaml, loader, _ = _yaml_backend()
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.load(f, Loader=loader) or {}
+
+
 class ConfigManager:
     """配置管理器"""
     
@@ -86,7 +133,12 @@ class ConfigManager:
     def __init__(self):
         self.config_dir = self._get_config_dir()
         self.config_file = self.config_dir / "config.yaml"
+        self.cache_file = self.config_dir / ".config.cache.json"
         self.config_data = self._load_config()
+        # 已构建的配置节对象缓存，配置变更时清空
+        self._cache: Dict[str, Any] = {}
+        # 配置版本号，每次配置变更时递增，供依赖配置的缓存判断是否失效
+        self.revision = 0
     
     @classmethod
     def set_config_dir(cls, config_dir: Path):
@@ -108,27 +160,30 @@ class ConfigManager:
         return config_dir
     
     def _get_default_config(self) -> Dict[str, Any]:
-        """获取默认配置"""
-        return {
-            "api": asdict(ApiConfig()),
-            "polling": asdict(PollingConfig()),
-            "display": asdict(DisplayConfig()),
-            "alerts": asdict(AlertConfig()),
-            "notification": asdict(NotificationConfig()),
-            "network": asdict(NetworkConfig()),
-            "logging": asdict(LoggingConfig())
-        }
+        """获取默认配置（返回副本，调用方可以自由修改）"""
+        return copy.deepcopy(_DEFAULT_CONFIG)
     
     def _load_config(self) -> Dict[str, Any]:
         """加载配置"""
         try:
             if self.config_file.exists():
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    user_config = yaml.safe_load(f) or {}
+                stat = self.config_file.stat()
+                cache_key = [stat.st_mtime_ns, stat.st_size, __version__]
+                
+                # 配置文件未变化时直接读取 JSON 缓存，跳过 YAML 解析和合并
+                cached_config = self._read_json_cache(cache_key)
+                if cached_config is not None:
+                    logger.info(f"已加载配置文件: {self.config_file} (缓存)")
+                    return cached_config
+                
+                user_config = copy.deepcopy(
+                    _parse_config_file(str(self.config_file), stat.st_mtime_ns, stat.st_size)
+                )
                 
                 # 合并默认配置和用户配置
                 default_config = self._get_default_config()
                 merged_config = self._deep_merge(default_config, user_config)
+                self._write_json_cache(cache_key, merged_config)
                 
                 logger.info(f"已加载配置文件: {self.config_file}")
                 return merged_config
@@ -143,15 +198,65 @@ class ConfigManager:
             logger.error(f"加载配置失败，使用默认配置: {e}")
             return self._get_default_config()
     
+    def _read_json_cache(self, cache_key: list) -> Optional[Dict[str, Any]]:
+        """
+        读取合并后配置的 JSON 缓存
+        
+        Args:
+            cache_key: 配置文件的 [mtime_ns, size, 版本号]
+            
+        Returns:
+            缓存的配置字典，缓存不存在或已失效时返回 None
+        """
+        try:
+            cache = json_codec.loads(self.cache_file.read_bytes())
+        except (OSError, ValueError):
+            return None
+        
+        if not isinstance(cache, dict) or cache.get("key") != cache_key:
+            return None
+        return cache.get("config")
+    
+    def _write_json_cache(self, cache_key: list, config: Dict[str, Any]):
+        """
+        原子写入合并后配置的 JSON 缓存，失败时仅记录日志
+        
+        只缓存能经 JSON 原样往返的配置：YAML 中的日期、非字符串键等类型经 JSON 后会
+        变成字符串，从缓存加载与直接解析的结果不一致，此时不写入缓存，每次都解析 YAML
+        """
+        try:
+            payload = json_codec.dumps_bytes({"key": cache_key, "config": config})
+            if json_codec.loads(payload)["config"] != config:
+                logger.debug("配置包含 JSON 无法原样表示的类型，跳过写入配置缓存")
+                return
+            
+            fd, tmp_path = tempfile.mkstemp(dir=self.config_dir, prefix=".config.cache.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(payload)
+                os.replace(tmp_path, self.cache_file)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except (OSError, TypeError, ValueError) as e:
+            logger.debug(f"写入配置缓存失败: {e}")
+    
     def _deep_merge(self, default: Dict[str, Any], user: Dict[str, Any]) -> Dict[str, Any]:
-        """深度合并配置字典"""
+        """深度合并配置字典（迭代实现，只复制用户配置覆盖到的嵌套字典）"""
         merged = default.copy()
+        stack = [(merged, user)]
         
-        for key, value in user.items():
-            if key in merged and isinstance(merged[key], dict) and isinstance(value, dict):
-                merged[key] = self._deep_merge(merged[key], value)
-            else:
-                merged[key] = value
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                current = target.get(key)
+                if isinstance(current, dict) and isinstance(value, dict):
+                    # 复制后再合并，避免修改默认配置中的字典
+                    current = current.copy()
+                    target[key] = current
+                    stack.append((current, value))
+                else:
+                    target[key] = value
         
         return merged
     
@@ -159,11 +264,13 @@ class ConfigManager:
         """保存配置"""
         try:
             self.config_dir.mkdir(exist_ok=True)
+            yaml, _, dumper = _yaml_backend()
             
             with open(self.config_file, 'w', encoding='utf-8') as f:
-                yaml.safe_dump(
+                yaml.dump(
                     config, 
                     f, 
+                    Dumper=dumper,
                     default_flow_style=False, 
                     allow_unicode=True,
                     indent=2
@@ -175,59 +282,65 @@ class ConfigManager:
             logger.error(f"保存配置失败: {e}")
             raise
     
+    def _get_section(self, section: str, config_cls):
+        """获取配置节对象，首次访问时构建并缓存"""
+        cached = self._cache.get(section)
+        if cached is None:
+            cached = self._cache.setdefault(section, config_cls(**self.config_data[section]))
+        return cached
+    
     def get_api_config(self) -> ApiConfig:
         """获取API配置"""
-        return ApiConfig(**self.config_data["api"])
+        return self._get_section("api", ApiConfig)
     
     def get_polling_config(self) -> PollingConfig:
         """获取轮询配置"""
-        return PollingConfig(**self.config_data["polling"])
+        return self._get_section("polling", PollingConfig)
     
     def get_display_config(self) -> DisplayConfig:
         """获取显示配置"""
-        return DisplayConfig(**self.config_data["display"])
+        return self._get_section("display", DisplayConfig)
     
     def get_alert_config(self) -> AlertConfig:
         """获取警报配置"""
-        return AlertConfig(**self.config_data["alerts"])
+        return self._get_section("alerts", AlertConfig)
     
     def get_notification_config(self) -> NotificationConfig:
         """获取通知配置"""
-        return NotificationConfig(**self.config_data["notification"])
+        return self._get_section("notification", NotificationConfig)
     
     def get_network_config(self) -> NetworkConfig:
         """获取网络配置"""
-        return NetworkConfig(**self.config_data["network"])
+        return self._get_section("network", NetworkConfig)
     
     def get_logging_config(self) -> LoggingConfig:
         """获取日志配置"""
-        return LoggingConfig(**self.config_data["logging"])
+        return self._get_section("logging", LoggingConfig)
     
-    # 便捷方法
+    # 便捷方法：直接读取配置字典，无需构建配置节对象
     def get_api_endpoint(self) -> str:
         """获取API端点"""
-        return self.get_api_config().endpoint
+        return self.config_data["api"]["endpoint"]
     
     def get_polling_interval(self) -> int:
         """获取轮询间隔"""
-        return self.get_polling_config().interval
+        return self.config_data["polling"]["interval"]
     
     def is_polling_enabled(self) -> bool:
         """是否启用轮询"""
-        return self.get_polling_config().enabled
+        return self.config_data["polling"]["enabled"]
     
     def get_proxy_url(self) -> Optional[str]:
-        """获取代理URL"""
-        proxy = self.get_network_config().proxy
-        if not proxy:
-            # 尝试从环境变量获取
-            return os.environ.get('HTTPS_PROXY') or os.environ.get('HTTP_PROXY')
-        return proxy if proxy.strip() else None
+        """获取代理URL，未配置时尝试从环境变量获取"""
+        proxy = (self.config_data["network"].get("proxy") or "").strip()
+        return proxy or os.environ.get('HTTPS_PROXY') or os.environ.get('HTTP_PROXY') or None
     
     def update_config(self, section: str, updates: Dict[str, Any]):
         """更新配置"""
         if section in self.config_data:
             self.config_data[section].update(updates)
+            self._cache.clear()
+            self.revision += 1
             self._save_config(self.config_data)
             logger.info(f"已更新配置节 '{section}': {updates}")
         else:
@@ -238,40 +351,43 @@ class ConfigManager:
         default_config = self._get_default_config()
         self._save_config(default_config)
         self.config_data = default_config
+        self._cache.clear()
+        self.revision += 1
         logger.info("配置已重置为默认值")
     
     def show_config(self):
         """显示当前配置"""
-        print("📋 当前配置:")
-        print(f"  配置文件: {self.config_file}")
-        print()
-        
-        api_config = self.get_api_config()
-        print("🔗 API配置:")
-        print(f"  端点: {api_config.endpoint}")
-        print(f"  超时: {api_config.timeout}秒")
-        print()
-        
-        polling_config = self.get_polling_config()
-        print("🔄 轮询配置:")
-        print(f"  启用: {polling_config.enabled}")
-        print(f"  间隔: {polling_config.interval}秒")
-        print()
-        
-        alert_config = self.get_alert_config()
-        print("⚠️  警报配置:")
-        print(f"  日预算警告阈值: {alert_config.daily_warning}%")
-        print(f"  日预算严重阈值: {alert_config.daily_critical}%")
-        print(f"  月预算警告阈值: {alert_config.monthly_warning}%")
-        print(f"  月预算严重阈值: {alert_config.monthly_critical}%")
-        print()
-        
-        network_config = self.get_network_config()
+        api_config = self.config_data["api"]
+        polling_config = self.config_data["polling"]
+        alert_config = self.config_data["alerts"]
+        network_config = self.config_data["network"]
         proxy_url = self.get_proxy_url()
-        print("🌐 网络配置:")
-        print(f"  代理: {proxy_url if proxy_url else '未设置'}")
-        print(f"  SSL验证: {network_config.verify_ssl}")
-        print()
+        
+        # 拼接完整文本后一次性写出，避免逐行 print
+        lines = [
+            "📋 当前配置:",
+            f"  配置文件: {self.config_file}",
+            "",
+            "🔗 API配置:",
+            f"  端点: {api_config['endpoint']}",
+            f"  超时: {api_config['timeout']}秒",
+            "",
+            "🔄 轮询配置:",
+            f"  启用: {polling_config['enabled']}",
+            f"  间隔: {polling_config['interval']}秒",
+            "",
+            "⚠️  警报配置:",
+            f"  日预算警告阈值: {alert_config['daily_warning']}%",
+            f"  日预算严重阈值: {alert_config['daily_critical']}%",
+            f"  月预算警告阈值: {alert_config['monthly_warning']}%",
+            f"  月预算严重阈值: {alert_config['monthly_critical']}%",
+            "",
+            "🌐 网络配置:",
+            f"  代理: {proxy_url if proxy_url else '未设置'}",
+            f"  SSL验证: {network_config['verify_ssl']}",
+            "",
+        ]
+        sys.stdout.write("\n".join(lines) + "\n")
     
     @property
     def config_directory(self) -> Path:
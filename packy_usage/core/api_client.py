@@ -5,23 +5,33 @@ API 客户端
 """
 
 import asyncio
-import aiohttp
-import requests
-from typing import Optional, Dict, Any
+import logging
+from typing import Optional, Dict, Any, Tuple
 from urllib.parse import urlparse
-import hashlib
-import json
 import time
 
 from .budget_data import BudgetData
 from .session_manager import SessionManager
 from ..config.manager import ConfigManager
 from ..security.token_manager import TokenManager
+from ..utils import json_codec
 from ..utils.exceptions import ApiError, NetworkError, AuthError
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 缓存键只需短指纹，不需要加密强度；安装了 xxhash 时使用更快的 xxh3
+try:
+    from xxhash import xxh3_64_hexdigest as _fingerprint
+except ImportError:  # xxhash 为可选依赖
+    import hashlib
+    
+    def _fingerprint(data: bytes) -> str:
+        return hashlib.blake2b(data, digest_size=4).hexdigest()
+
+# 表示认证失败的状态码
+_AUTH_FAIL = frozenset({401, 403})
+
 
 class ApiClient:
     """API 客户端 - 使用连接池和缓存优化"""
@@ -29,9 +39,25 @@ class ApiClient:
     def __init__(self, config: ConfigManager, token_manager: TokenManager):
         self.config = config
         self.token_manager = token_manager
-        self.session_manager = SessionManager.get_instance()
-        self._last_request_time = 0
+        self._session_manager: Optional[SessionManager] = None
+        # 上一次实际发出请求的时间（time.monotonic()），缓存命中不更新
+        self._last_request_time: Optional[float] = None
         self._min_request_interval = 1  # 最小请求间隔（秒）
+        # (token, endpoint, cache_key)，token 或端点变化时才重新计算
+        self._cache_key_cache: Optional[Tuple[str, str, str]] = None
+        # (token, 请求头)，token 变化时才重新构建
+        self._headers_for_token: Optional[Tuple[str, Dict[str, str]]] = None
+        # 代理配置缓存，_proxy_revision 与配置版本号不一致时重新读取
+        self._proxy_url: Optional[str] = None
+        self._proxies_cache: Optional[Dict[str, str]] = None
+        self._proxy_revision: Optional[int] = None
+    
+    @property
+    def session_manager(self) -> SessionManager:
+        """会话管理器，首次使用时才获取单例"""
+        if self._session_manager is None:
+            self._session_manager = SessionManager.get_instance()
+        return self._session_manager
         
     async def __aenter__(self):
         """异步上下文管理器入口"""
@@ -43,103 +69,157 @@ class ApiClient:
         # SessionManager 会自动管理会话生命周期
         pass
     
+    def refresh_network_config(self):
+        """丢弃缓存的代理配置，下次请求时重新读取"""
+        self._proxy_revision = None
+    
+    def _load_proxy_config(self):
+        """按需读取代理配置并缓存"""
+        if self._proxy_revision == self.config.revision:
+            return
+        
+        proxy_url = self.config.get_proxy_url()
+        self._proxy_url = proxy_url
+        self._proxies_cache = {'http': proxy_url, 'https': proxy_url} if proxy_url else None
+        self._proxy_revision = self.config.revision
+    
+    def _get_proxy_url(self) -> Optional[str]:
+        """获取代理URL（异步请求使用）"""
+        self._load_proxy_config()
+        return self._proxy_url
+    
+    def _get_proxies(self) -> Optional[Dict[str, str]]:
+        """获取 requests 使用的代理映射（同步请求使用）"""
+        self._load_proxy_config()
+        return self._proxies_cache
+    
+    def _get_auth_headers(self, token: str) -> Dict[str, str]:
+        """获取认证请求头，同一 token 复用同一个字典"""
+        cached = self._headers_for_token
+        if cached and cached[0] == token:
+            return cached[1]
+        
+        headers = {'Authorization': f'Bearer {token}'}
+        self._headers_for_token = (token, headers)
+        return headers
+    
     def _get_cache_key(self, token: str) -> str:
         """生成缓存键"""
-        # 使用 token 的哈希值作为缓存键的一部分
-        token_hash = hashlib.md5(token.encode()).hexdigest()[:8]
         endpoint = self.config.get_api_endpoint()
-        endpoint_hash = hashlib.md5(endpoint.encode()).hexdigest()[:8]
-        return f"budget_data_{endpoint_hash}_{token_hash}"
+        cached = self._cache_key_cache
+        if cached and cached[0] == token and cached[1] == endpoint:
+            return cached[2]
+        
+        # 使用 token 的哈希值作为缓存键的一部分
+        cache_key = f"budget_data_{_fingerprint(endpoint.encode())}_{_fingerprint(token.encode())}"
+        
+        self._cache_key_cache = (token, endpoint, cache_key)
+        return cache_key
+    
+    def _prepare_request(self) -> Tuple[Optional[str], Optional[str], Optional[BudgetData]]:
+        """
+        请求前的公共准备：读取 Token 并检查缓存
+        
+        Returns:
+            (token, cache_key, 缓存的数据)；未找到 Token 时全部为 None
+        """
+        token = self.token_manager.get_token()
+        if not token:
+            logger.warning("未找到API Token")
+            return None, None, None
+        
+        cache_key = self._get_cache_key(token)
+        cached_data = self.session_manager.get_cached_data(cache_key)
+        if cached_data:
+            logger.info("使用缓存的预算数据")
+        return token, cache_key, cached_data
+    
+    def _rate_limit_delay(self) -> float:
+        """距离允许下一次请求还需等待的秒数"""
+        if self._last_request_time is None:
+            return 0.0
+        # 使用单调时钟，系统时间被调整时不会导致过长的等待
+        time_since_last = time.monotonic() - self._last_request_time
+        return max(0.0, self._min_request_interval - time_since_last)
+    
+    def _raise_for_status(self, status: int, error_text: str):
+        """
+        处理失败的响应状态码
+        
+        Raises:
+            AuthError: 认证失败（401/403），同时清理可能过期的 Token 和缓存
+            ApiError: 其他错误状态码
+        """
+        if status in _AUTH_FAIL:
+            self.token_manager.delete_token()
+            self.session_manager.clear_cache()
+            logger.error(f"认证失败 ({status}): {error_text}")
+            raise AuthError(f"认证失败 ({status}): {error_text}")
+        
+        logger.error(f"API请求失败 ({status}): {error_text}")
+        raise ApiError(f"API请求失败 ({status}): {error_text}")
+    
+    def _process_response(self, data: Dict[str, Any], cache_key: str) -> BudgetData:
+        """解析响应数据并写入缓存"""
+        budget_data = BudgetData.from_api_response(data)
+        
+        # 缓存数据
+        self.session_manager.set_cached_data(cache_key, budget_data)
+        
+        logger.info(f"成功获取预算数据: 日使用率={budget_data.daily.percentage:.1f}%, "
+                   f"月使用率={budget_data.monthly.percentage:.1f}%")
+        
+        # 输出连接统计信息（调试用）
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("连接池状态: %s", self.session_manager.get_stats())
+        
+        return budget_data
     
     def _sync_fetch_budget_data(self) -> Optional[BudgetData]:
         """同步版本的预算数据获取（使用连接池和缓存）"""
+        # 延迟导入，异步路径和不发请求的命令无需加载 requests
+        import requests
+        
         try:
-            token = self.token_manager.get_token()
-            if not token:
-                logger.warning("未找到API Token")
-                return None
-            
-            # 检查缓存
-            cache_key = self._get_cache_key(token)
-            cached_data = self.session_manager.get_cached_data(cache_key)
-            if cached_data:
-                logger.info("使用缓存的预算数据")
+            token, cache_key, cached_data = self._prepare_request()
+            if not token or cached_data:
                 return cached_data
             
             # 限制请求频率
-            current_time = time.time()
-            time_since_last = current_time - self._last_request_time
-            if time_since_last < self._min_request_interval:
-                time.sleep(self._min_request_interval - time_since_last)
+            delay = self._rate_limit_delay()
+            if delay:
+                time.sleep(delay)
             
             endpoint = self.config.get_api_endpoint()
             
             # 使用连接池的会话
             session = self.session_manager.get_sync_session()
             
-            # 设置请求头
-            headers = {
-                'Authorization': f'Bearer {token}'
-            }
-            
-            # 配置代理
-            proxies = {}
-            proxy_url = self.config.get_proxy_url()
-            if proxy_url:
-                proxies = {
-                    'http': proxy_url,
-                    'https': proxy_url
-                }
-            
-            logger.debug(f"发送API请求: {endpoint}")
+            logger.debug("发送API请求: %s", endpoint)
             
             # 发送请求（使用持久连接）
             response = session.get(
                 endpoint,
-                headers=headers,
-                proxies=proxies,
+                headers=self._get_auth_headers(token),
+                proxies=self._get_proxies(),
                 timeout=self.session_manager.timeout,
                 verify=True  # 强制SSL证书验证
             )
             
             # 更新最后请求时间
-            self._last_request_time = time.time()
-            
-            if response.status_code == 401 or response.status_code == 403:
-                # 认证失败，清理可能过期的Token和缓存
-                self.token_manager.delete_token()
-                self.session_manager.clear_cache()
-                error_text = response.text
-                logger.error(f"认证失败 ({response.status_code}): {error_text}")
-                raise AuthError(f"认证失败 ({response.status_code}): {error_text}")
+            self._last_request_time = time.monotonic()
             
             if not response.ok:
-                error_text = response.text
-                logger.error(f"API请求失败 ({response.status_code}): {error_text}")
-                logger.debug(f"请求URL: {endpoint}")
-                logger.debug(f"请求头: {headers}")
-                raise ApiError(f"API请求失败 ({response.status_code}): {error_text}")
+                self._raise_for_status(response.status_code, response.text)
             
             # 解析响应
             try:
-                data = response.json()
+                data = json_codec.loads(response.content)
             except ValueError as e:
                 logger.error(f"JSON解析失败: {e}, 响应内容: {response.text[:500]}")
                 raise ApiError(f"服务器响应格式错误: {e}")
             
-            budget_data = BudgetData.from_api_response(data)
-            
-            # 缓存数据
-            self.session_manager.set_cached_data(cache_key, budget_data)
-            
-            logger.info(f"成功获取预算数据: 日使用率={budget_data.daily.percentage:.1f}%, "
-                       f"月使用率={budget_data.monthly.percentage:.1f}%")
-            
-            # 输出连接统计信息（调试用）
-            stats = self.session_manager.get_stats()
-            logger.debug(f"连接池状态: {stats}")
-            
-            return budget_data
+            return self._process_response(data, cache_key)
             
         except requests.exceptions.Timeout:
             raise NetworkError("请求超时")
@@ -147,89 +227,66 @@ class ApiClient:
             raise NetworkError(f"网络连接失败: {e}")
         except requests.exceptions.RequestException as e:
             raise NetworkError(f"网络请求异常: {e}")
+        except (AuthError, ApiError):
+            raise
         except Exception as e:
             logger.error(f"获取预算数据时发生未知错误: {e}")
             raise ApiError(f"未知错误: {e}")
     
     async def fetch_budget_data(self) -> Optional[BudgetData]:
         """异步获取预算数据（使用连接池和缓存）"""
+        # 延迟导入，aiohttp 会连带加载 yarl、multidict 等大量模块
+        import aiohttp
+        
         try:
-            token = self.token_manager.get_token()
-            if not token:
-                logger.warning("未找到API Token")
-                return None
-            
-            # 检查缓存
-            cache_key = self._get_cache_key(token)
-            cached_data = self.session_manager.get_cached_data(cache_key)
-            if cached_data:
-                logger.info("使用缓存的预算数据")
+            token, cache_key, cached_data = self._prepare_request()
+            if not token or cached_data:
                 return cached_data
             
             # 限制请求频率
-            current_time = time.time()
-            time_since_last = current_time - self._last_request_time
-            if time_since_last < self._min_request_interval:
-                await asyncio.sleep(self._min_request_interval - time_since_last)
+            delay = self._rate_limit_delay()
+            if delay:
+                await asyncio.sleep(delay)
             
             # 获取会话（使用连接池）
             session = await self.session_manager.get_async_session()
             
             endpoint = self.config.get_api_endpoint()
-            headers = {
-                'Authorization': f'Bearer {token}'
-            }
-            
-            # 配置代理
-            proxy = None
-            proxy_url = self.config.get_proxy_url()
-            if proxy_url:
-                proxy = proxy_url
             
-            logger.debug(f"发送异步API请求: {endpoint}")
+            logger.debug("发送异步API请求: %s", endpoint)
             
-            async with session.get(
-                endpoint,
-                headers=headers,
-                proxy=proxy,
-                ssl=True  # 强制SSL
-            ) as response:
-                
-                # 更新最后请求时间
-                self._last_request_time = time.time()
-                
-                if response.status in (401, 403):
-                    # 认证失败，清理可能过期的Token和缓存
-                    self.token_manager.delete_token()
-                    self.session_manager.clear_cache()
-                    raise AuthError(f"认证失败 ({response.status})")
-                
-                if response.status != 200:
-                    text = await response.text()
-                    raise ApiError(f"API请求失败 ({response.status}): {text}")
-                
-                # 解析响应
-                data = await response.json()
-                budget_data = BudgetData.from_api_response(data)
-                
-                # 缓存数据
-                self.session_manager.set_cached_data(cache_key, budget_data)
+            # 并发请求超过连接池大小时在此排队
+            async with self.session_manager.async_request_slot():
+                async with session.get(
+                    endpoint,
+                    headers=self._get_auth_headers(token),
+                    proxy=self._get_proxy_url(),
+                    ssl=True  # 强制SSL
+                ) as response:
                 
-                logger.info(f"成功获取预算数据: 日使用率={budget_data.daily.percentage:.1f}%, "
-                           f"月使用率={budget_data.monthly.percentage:.1f}%")
+                    # 更新最后请求时间
+                    self._last_request_time = time.monotonic()
                 
-                # 输出连接统计信息（调试用）
-                stats = self.session_manager.get_stats()
-                logger.debug(f"连接池状态: {stats}")
+                    if response.status >= 400:
+                        self._raise_for_status(response.status, await response.text())
                 
-                return budget_data
+                    # 解析响应
+                    raw = await response.read()
+                    try:
+                        data = json_codec.loads(raw)
+                    except ValueError as e:
+                        logger.error(f"JSON解析失败: {e}, 响应内容: {raw[:500]!r}")
+                        raise ApiError(f"服务器响应格式错误: {e}")
+                    return self._process_response(data, cache_key)
         
-        except aiohttp.ClientTimeout:
+        except asyncio.TimeoutError:
             raise NetworkError("请求超时")
         except aiohttp.ClientConnectionError as e:
             raise NetworkError(f"网络连接失败: {e}")
         except aiohttp.ClientError as e:
             raise NetworkError(f"网络请求异常: {e}")
+        except (AuthError, ApiError):
+            raise
         except Exception as e:
             logger.error(f"获取预算数据时发生未知错误: {e}")
             raise ApiError(f"未知错误: {e}")
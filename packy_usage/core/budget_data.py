@@ -2,66 +2,96 @@
 预算数据模型
 """
 
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
 from typing import Optional, Dict, Any
 from datetime import datetime
 
+# dataclass 的 slots 参数需要 Python 3.10+，旧版本仅使用 frozen
+_DATACLASS_OPTIONS = {"frozen": True}
+if sys.version_info >= (3, 10):
+    _DATACLASS_OPTIONS["slots"] = True
 
-@dataclass
+# 整体状态对应的图标
+_STATUS_ICONS = {
+    "critical": "🔴",
+    "warning": "🟡",
+    "notice": "🔵",
+    "normal": "🟢"
+}
+
+
+@dataclass(**_DATACLASS_OPTIONS)
 class BudgetUsage:
-    """预算使用情况"""
+    """预算使用情况（不可变，可安全地在缓存中共享）"""
     percentage: float  # 使用百分比
     total: float      # 总预算金额
     used: float       # 已使用金额
+    remaining: float = field(init=False)  # 剩余预算，创建时计算
+    # 以下派生字段均在创建时计算一次
+    is_warning: bool = field(init=False, repr=False, compare=False)   # 是否为警告状态 (>= 75%)
+    is_critical: bool = field(init=False, repr=False, compare=False)  # 是否为严重状态 (>= 90%)
+    status_icon: str = field(init=False, repr=False, compare=False)   # 状态图标
     
-    @property
-    def remaining(self) -> float:
-        """剩余预算"""
-        return max(0, self.total - self.used)
-    
-    @property
-    def is_warning(self) -> bool:
-        """是否为警告状态 (>= 75%)"""
-        return self.percentage >= 75
-    
-    @property
-    def is_critical(self) -> bool:
-        """是否为严重状态 (>= 90%)"""
-        return self.percentage >= 90
-    
-    @property
-    def status_icon(self) -> str:
-        """获取状态图标"""
+    def __post_init__(self):
+        set_field = object.__setattr__
+        set_field(self, "remaining", max(0, self.total - self.used))
+        set_field(self, "is_warning", self.percentage >= 75)
+        set_field(self, "is_critical", self.percentage >= 90)
+        
         if self.is_critical:
-            return "🔴"  # 严重
+            icon = "🔴"  # 严重
         elif self.is_warning:
-            return "🟡"  # 警告
+            icon = "🟡"  # 警告
         elif self.percentage >= 50:
-            return "🔵"  # 注意
+            icon = "🔵"  # 注意
         else:
-            return "🟢"  # 安全
+            icon = "🟢"  # 安全
+        set_field(self, "status_icon", icon)
 
 
-@dataclass
+@dataclass(**_DATACLASS_OPTIONS)
 class BudgetData:
-    """完整预算数据"""
+    """完整预算数据（不可变，可安全地在缓存中共享）"""
     daily: BudgetUsage
     monthly: BudgetUsage
     last_updated: Optional[datetime] = None
+    # 以下派生字段均在创建时计算一次
+    max_usage_percentage: float = field(init=False, repr=False, compare=False)  # 最高使用率
+    overall_status: str = field(init=False, repr=False, compare=False)          # 整体状态
+    status_icon: str = field(init=False, repr=False, compare=False)             # 整体状态图标
+    _dict_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        set_field = object.__setattr__
+        max_percent = max(self.daily.percentage, self.monthly.percentage)
+        set_field(self, "max_usage_percentage", max_percent)
+        
+        if max_percent >= 90:
+            status = "critical"
+        elif max_percent >= 75:
+            status = "warning"
+        elif max_percent >= 50:
+            status = "notice"
+        else:
+            status = "normal"
+        set_field(self, "overall_status", status)
+        set_field(self, "status_icon", _STATUS_ICONS.get(status, "❓"))
     
     @classmethod
     def from_api_response(cls, data: Dict[str, Any]) -> 'BudgetData':
-        """从API响应创建预算数据对象"""
+        """从API响应创建预算数据对象（缺失或为 null 的字段按 0 处理）"""
+        get = data.get
         
         # 解析日预算
-        daily_budget = float(data.get('daily_budget_usd', 0))
-        daily_spent = float(data.get('daily_spent_usd', 0))
-        daily_percentage = (daily_spent / daily_budget * 100) if daily_budget > 0 else 0
+        daily_budget = float(get('daily_budget_usd') or 0)
+        daily_spent = float(get('daily_spent_usd') or 0)
+        daily_percentage = (daily_spent * 100.0 / daily_budget) if daily_budget > 0 else 0.0
         
         # 解析月预算
-        monthly_budget = float(data.get('monthly_budget_usd', 0))
-        monthly_spent = float(data.get('monthly_spent_usd', 0))
-        monthly_percentage = (monthly_spent / monthly_budget * 100) if monthly_budget > 0 else 0
+        monthly_budget = float(get('monthly_budget_usd') or 0)
+        monthly_spent = float(get('monthly_spent_usd') or 0)
+        monthly_percentage = (monthly_spent * 100.0 / monthly_budget) if monthly_budget > 0 else 0.0
         
         return cls(
             daily=BudgetUsage(
@@ -77,52 +107,33 @@ class BudgetData:
             last_updated=datetime.now()
         )
     
-    @property
-    def max_usage_percentage(self) -> float:
-        """获取最高使用率"""
-        return max(self.daily.percentage, self.monthly.percentage)
-    
-    @property
-    def overall_status(self) -> str:
-        """获取整体状态"""
-        max_percent = self.max_usage_percentage
-        if max_percent >= 90:
-            return "critical"
-        elif max_percent >= 75:
-            return "warning"
-        elif max_percent >= 50:
-            return "notice"
-        else:
-            return "normal"
-    
-    @property
-    def status_icon(self) -> str:
-        """获取整体状态图标"""
-        status = self.overall_status
-        icons = {
-            "critical": "🔴",
-            "warning": "🟡", 
-            "notice": "🔵",
-            "normal": "🟢"
-        }
-        return icons.get(status, "❓")
-    
     def to_dict(self) -> Dict[str, Any]:
-        """转换为字典格式"""
-        return {
+        """
+        转换为字典格式
+        
+        实例不可变，结果在首次调用时生成并缓存；调用方不得修改返回值
+        """
+        if self._dict_cache is not None:
+            return self._dict_cache
+        
+        daily = self.daily
+        monthly = self.monthly
+        result = {
             "daily": {
-                "percentage": round(self.daily.percentage, 2),
-                "total": round(self.daily.total, 2),
-                "used": round(self.daily.used, 2),
-                "remaining": round(self.daily.remaining, 2)
+                "percentage": round(daily.percentage, 2),
+                "total": round(daily.total, 2),
+                "used": round(daily.used, 2),
+                "remaining": round(daily.remaining, 2)
             },
             "monthly": {
-                "percentage": round(self.monthly.percentage, 2),
-                "total": round(self.monthly.total, 2),
-                "used": round(self.monthly.used, 2),
-                "remaining": round(self.monthly.remaining, 2)
+                "percentage": round(monthly.percentage, 2),
+                "total": round(monthly.total, 2),
+                "used": round(monthly.used, 2),
+                "remaining": round(monthly.remaining, 2)
             },
             "overall_status": self.overall_status,
             "max_usage_percentage": round(self.max_usage_percentage, 2),
             "last_updated": self.last_updated.isoformat() if self.last_updated else None
-        }
\ No newline at end of file
+        }
+        object.__setattr__(self, "_dict_cache", result)
+        return result
@@ -3,38 +3,94 @@
 包含图标缓存、线程池管理和批量更新机制
 """
 
+import os
+import sys
 import threading
-import queue
 import time
+import weakref
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, Callable, Tuple
-from datetime import datetime, timedelta
-from pathlib import Path
-import hashlib
-import weakref
+from functools import lru_cache, partial
 
 from PIL import Image, ImageDraw, ImageFont
-import io
 
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def _gil_enabled() -> bool:
+    """当前解释器是否启用了 GIL（Python 3.13+ 的自由线程构建可以关闭 GIL）"""
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled() if is_gil_enabled else True
+
+
+# 默认图标的状态颜色映射
+_DEFAULT_ICON_COLORS = {
+    "normal": "#00AA00",
+    "warning": "#FFAA00",
+    "critical": "#FF0000",
+    "error": "#AA0000",
+    "init": "#808080"
+}
+_DEFAULT_ICON_SIZE = (32, 32)
+
+
+@lru_cache(maxsize=None)
+def _get_default_font():
+    """默认图标使用的字体，每个进程只查找一次"""
+    try:
+        # 尝试使用系统字体
+        return ImageFont.truetype("arial.ttf", 12)
+    except OSError:
+        return ImageFont.load_default()
+
+
+class _CacheShard:
+    """IconCache 的一个分片：独立的锁和 LRU 有序字典"""
+    
+    __slots__ = ('lock', 'cache', 'max_size')
+    
+    def __init__(self, max_size: int):
+        self.lock = threading.Lock()
+        # 按访问顺序排列，最近使用的在末尾
+        self.cache: 'OrderedDict[Tuple[str, int], Image.Image]' = OrderedDict()
+        self.max_size = max_size
+
+
 class IconCache:
     """
     图标缓存管理器
     避免重复创建图标，提高渲染性能
+    
+    缓存按键的哈希分片，每个分片独立加锁，并发渲染不同图标时互不阻塞。
+    图标是 (状态, 整数百分比) 的纯函数，不会过期，只按容量做 LRU 淘汰
     """
     
-    def __init__(self, max_cache_size: int = 100):
-        self._cache: Dict[str, Image.Image] = {}
-        self._access_times: Dict[str, datetime] = {}
+    def __init__(self, max_cache_size: int = 100, shard_count: int = 8):
         self._max_cache_size = max_cache_size
-        self._lock = threading.Lock()
-        self._cache_ttl = timedelta(minutes=10)  # 缓存10分钟
+        self._shard_count = max(1, min(shard_count, max_cache_size))
+        # 各分片容量之和不超过总容量
+        shard_size = max(1, max_cache_size // self._shard_count)
+        self._shards = [_CacheShard(shard_size) for _ in range(self._shard_count)]
+        
+        # 默认图标只有数字随百分比变化：预先绘制各状态的底图并加载一次字体
+        self._font = _get_default_font()
+        self._base_images = {
+            status: self._create_base_image(color)
+            for status, color in _DEFAULT_ICON_COLORS.items()
+        }
+        # 默认图标是 (状态, 整数百分比) 的纯函数，直接使用 C 实现的 lru_cache，无需分片和加锁
+        self._render_default_icon = lru_cache(maxsize=max_cache_size)(self._create_default_icon)
+        # prewarm() 生成的完整图标表：(状态, 整数百分比) -> 图标，生成后只读
+        self._table: Dict[Tuple[str, int], Image.Image] = {}
         
-        logger.info(f"IconCache 初始化: 最大缓存={max_cache_size}, TTL={self._cache_ttl}")
+        logger.info(f"IconCache 初始化: 最大缓存={max_cache_size}, 分片={self._shard_count}")
+    
+    def _get_shard(self, cache_key: Tuple[str, int]) -> _CacheShard:
+        """根据缓存键选择分片"""
+        return self._shards[(hash(cache_key) & 0x7fffffff) % self._shard_count]
     
     def get_icon(self, status: str, percentage: float, 
                  creator_func: Optional[Callable] = None) -> Image.Image:
@@ -49,117 +105,162 @@ class IconCache:
         Returns:
             缓存的或新创建的图标
         """
-        # 生成缓存键（精度降低到整数百分比）
-        cache_key = f"{status}_{int(percentage)}"
+        # 预渲染表是只读的，查表无需加锁
+        icon = self._table.get((status, int(percentage)))
+        if icon is not None:
+            return icon
         
-        with self._lock:
+        if creator_func is None:
+            return self._render_default_icon(status, int(percentage))
+        
+        # 自定义创建函数：缓存键为 (状态, 整数百分比) 元组，与预渲染表一致
+        cache_key = (status, int(percentage))
+        shard = self._get_shard(cache_key)
+        
+        with shard.lock:
             # 检查缓存
-            if cache_key in self._cache:
-                # 更新访问时间
-                self._access_times[cache_key] = datetime.now()
-                logger.debug(f"图标缓存命中: {cache_key}")
-                return self._cache[cache_key]
+            icon = shard.cache.get(cache_key)
+            if icon is not None:
+                # 标记为最近使用
+                shard.cache.move_to_end(cache_key)
+                logger.debug("图标缓存命中: %s", cache_key)
+                return icon
             
-            # 创建新图标
-            if creator_func:
-                icon = creator_func(status, percentage)
-            else:
-                icon = self._create_default_icon(status, percentage)
+            # 创建新图标：按缓存键中的整数百分比绘制，保证缓存内容与键一致
+            icon = creator_func(status, cache_key[1])
             
             # 添加到缓存
-            self._add_to_cache(cache_key, icon)
+            self._add_to_cache(shard, cache_key, icon)
             
             return icon
     
-    def _create_default_icon(self, status: str, percentage: float) -> Image.Image:
-        """创建默认图标"""
-        size = (32, 32)
-        image = Image.new('RGBA', size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(image)
+    def prewarm(self, creator_func: Optional[Callable] = None, statuses=None,
+                static_statuses=()):
+        """
+        预渲染所有 (状态, 0-100%) 的图标，之后 get_icon 只需一次字典查找
         
-        # 状态颜色映射
-        colors = {
-            "normal": "#00AA00",
-            "warning": "#FFAA00",
-            "critical": "#FF0000",
-            "error": "#AA0000",
-            "init": "#808080"
-        }
+        整个组合空间只有几百个 32x32 图标，内存占用很小。
+        生成完成后一次性替换图标表，可在后台线程中调用。
         
-        color = colors.get(status, "#808080")
+        Args:
+            creator_func: 图标创建函数，None 表示使用默认图标
+            statuses: 需要预渲染的状态列表，默认为默认图标的所有状态
+            static_statuses: 图标与百分比无关的状态，只渲染一次并在整行共用
+        """
+        create = creator_func or self._create_default_icon
+        statuses = list(statuses or _DEFAULT_ICON_COLORS)
+        static_statuses = frozenset(static_statuses)
+        start = time.perf_counter()
         
-        # 绘制圆形背景
-        draw.ellipse([2, 2, 30, 30], fill=color, outline=color)
+        def render_row(status):
+            if status in static_statuses:
+                icon = create(status, 0)
+                return [((status, pct), icon) for pct in range(101)]
+            return [((status, pct), create(status, pct)) for pct in range(101)]
         
-        # 绘制百分比文字
-        try:
-            # 尝试使用系统字体
-            font = ImageFont.truetype("arial.ttf", 12)
-        except:
-            font = ImageFont.load_default()
+        # 字体渲染持有 GIL，只有在自由线程构建中按状态并行渲染才有收益
+        workers = min(len(statuses), os.cpu_count() or 1)
+        if workers > 1 and not _gil_enabled():
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="IconPrewarm") as executor:
+                rows = list(executor.map(render_row, statuses))
+        else:
+            rows = [render_row(status) for status in statuses]
+        
+        table = {key: icon for row in rows for key, icon in row}
+        self._table = table
+        logger.info(f"图标预渲染完成: {len(table)} 个, 耗时 {time.perf_counter() - start:.2f}秒")
+    
+    @staticmethod
+    def _create_base_image(color: str) -> Image.Image:
+        """绘制默认图标的圆形底图"""
+        image = Image.new('RGBA', _DEFAULT_ICON_SIZE, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(image)
+        draw.ellipse([2, 2, 30, 30], fill=color, outline=color)
+        return image
+    
+    def _create_default_icon(self, status: str, percentage: float) -> Image.Image:
+        """创建默认图标：复制状态底图后绘制百分比文字"""
+        base = self._base_images.get(status) or self._base_images["init"]
+        image = base.copy()
+        draw = ImageDraw.Draw(image)
         
         text = f"{int(percentage)}"
-        bbox = draw.textbbox((0, 0), text, font=font)
+        bbox = draw.textbbox((0, 0), text, font=self._font)
         text_width = bbox[2] - bbox[0]
         text_height = bbox[3] - bbox[1]
-        position = ((size[0] - text_width) // 2, (size[1] - text_height) // 2)
-        draw.text(position, text, fill="white", font=font)
+        position = ((_DEFAULT_ICON_SIZE[0] - text_width) // 2, (_DEFAULT_ICON_SIZE[1] - text_height) // 2)
+        draw.text(position, text, fill="white", font=self._font)
         
         return image
     
-    def _add_to_cache(self, key: str, icon: Image.Image):
-        """添加图标到缓存"""
-        # 如果缓存已满，清理最旧的项
-        if len(self._cache) >= self._max_cache_size:
-            self._cleanup_cache()
-        
-        self._cache[key] = icon
-        self._access_times[key] = datetime.now()
-        logger.debug(f"图标添加到缓存: {key}, 当前缓存大小: {len(self._cache)}")
-    
-    def _cleanup_cache(self):
-        """清理缓存（LRU + TTL）"""
-        now = datetime.now()
-        
-        # 清理过期的缓存
-        expired_keys = [
-            key for key, access_time in self._access_times.items()
-            if now - access_time > self._cache_ttl
-        ]
-        
-        for key in expired_keys:
-            del self._cache[key]
-            del self._access_times[key]
-            logger.debug(f"清理过期图标缓存: {key}")
-        
-        # 如果还是超过限制，删除最少使用的
-        if len(self._cache) >= self._max_cache_size:
-            # 按访问时间排序，删除最旧的
-            sorted_keys = sorted(self._access_times.items(), key=lambda x: x[1])
-            keys_to_remove = [k for k, _ in sorted_keys[:len(self._cache) // 4]]
-            
-            for key in keys_to_remove:
-                del self._cache[key]
-                del self._access_times[key]
-                logger.debug(f"清理LRU图标缓存: {key}")
+    def _add_to_cache(self, shard: _CacheShard, key: Tuple[str, int], icon: Image.Image):
+        """添加图标到分片缓存（调用方需持有分片锁）"""
+        shard.cache[key] = icon
+        shard.cache.move_to_end(key)
+        
+        # 超出容量时淘汰最久未使用的
+        while len(shard.cache) > shard.max_size:
+            old_key, _ = shard.cache.popitem(last=False)
+            logger.debug("清理LRU图标缓存: %s", old_key)
+        
+        logger.debug("图标添加到缓存: %s, 当前分片大小: %d", key, len(shard.cache))
     
     def clear(self):
         """清空所有缓存"""
-        with self._lock:
-            self._cache.clear()
-            self._access_times.clear()
-            logger.info("图标缓存已清空")
+        for shard in self._shards:
+            with shard.lock:
+                shard.cache.clear()
+        self._render_default_icon.cache_clear()
+        self._table = {}
+        logger.info("图标缓存已清空")
     
     def get_stats(self) -> Dict[str, Any]:
         """获取缓存统计信息"""
+        cache_size = 0
+        for shard in self._shards:
+            with shard.lock:
+                cache_size += len(shard.cache)
+        
+        default_info = self._render_default_icon.cache_info()
+        
         return {
-            'cache_size': len(self._cache),
+            'cache_size': cache_size + default_info.currsize,
             'max_size': self._max_cache_size,
-            'ttl_minutes': self._cache_ttl.total_seconds() / 60,
-            'oldest_access': min(self._access_times.values()) if self._access_times else None
+            'shard_count': self._shard_count,
+            'prewarmed_icons': len(self._table),
+            'default_icon_hits': default_info.hits,
+            'default_icon_misses': default_info.misses
         }
 
 
+class _TaskCounter:
+    """线程池任务计数"""
+    
+    __slots__ = ('lock', 'submitted', 'completed')
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+
+
+def _on_task_done(counter: _TaskCounter, future):
+    """
+    任务完成回调：计数并记录任务异常
+    
+    定义为模块级函数并只绑定计数器，回调不持有线程池本身，避免形成引用环
+    """
+    with counter.lock:
+        counter.completed += 1
+    
+    # exception() 不会重新抛出异常；已完成的 future 不会阻塞
+    exc = None if future.cancelled() else future.exception()
+    if exc is not None:
+        logger.error(f"线程池任务异常: {exc}")
+    # 及时释放对异常及其 traceback 的引用
+    del exc, future
+
+
 class ManagedThreadPool:
     """
     托管的线程池
@@ -171,7 +272,9 @@ class ManagedThreadPool:
             max_workers=max_workers,
             thread_name_prefix=thread_name_prefix
         )
-        self._futures = weakref.WeakSet()
+        # 只统计任务数量，不持有 future 引用
+        self._counter = _TaskCounter()
+        self._on_done = partial(_on_task_done, self._counter)
         self._lock = threading.Lock()
         self._shutdown = False
         
@@ -182,65 +285,119 @@ class ManagedThreadPool:
         if self._shutdown:
             raise RuntimeError("线程池已关闭")
         
-        future = self.executor.submit(fn, *args, **kwargs)
+        # 先计数再提交：任务可能在 submit 返回前就已完成，保证 completed 不会超过 submitted
+        with self._counter.lock:
+            self._counter.submitted += 1
         
-        with self._lock:
-            self._futures.add(future)
+        try:
+            future = self.executor.submit(fn, *args, **kwargs)
+        except BaseException:
+            with self._counter.lock:
+                self._counter.submitted -= 1
+            raise
         
-        # 添加完成回调以清理引用
-        future.add_done_callback(self._cleanup_future)
+        # 添加完成回调以统计并记录异常
+        future.add_done_callback(self._on_done)
         
         return future
     
-    def _cleanup_future(self, future):
-        """清理完成的 future"""
-        try:
-            # 获取结果或异常（避免未处理的异常）
-            future.result(timeout=0)
-        except Exception as e:
-            logger.error(f"线程池任务异常: {e}")
-    
     def map(self, fn: Callable, *iterables, timeout=None):
         """并行映射函数到可迭代对象"""
         return self.executor.map(fn, *iterables, timeout=timeout)
     
-    def shutdown(self, wait: bool = True):
-        """关闭线程池"""
+    def shutdown(self, wait: bool = True, cancel_futures: bool = False):
+        """
+        关闭线程池
+        
+        Args:
+            wait: 是否等待所有已提交的任务完成
+            cancel_futures: 是否取消尚未开始执行的任务（Python 3.9+）
+        """
         with self._lock:
             self._shutdown = True
         
-        self.executor.shutdown(wait=wait)
+        if cancel_futures and sys.version_info >= (3, 9):
+            self.executor.shutdown(wait=wait, cancel_futures=True)
+        else:
+            self.executor.shutdown(wait=wait)
         logger.info("线程池已关闭")
     
     def get_stats(self) -> Dict[str, Any]:
         """获取线程池统计信息"""
-        active_count = sum(1 for f in self._futures if not f.done())
-        completed_count = sum(1 for f in self._futures if f.done())
+        with self._counter.lock:
+            submitted = self._counter.submitted
+            completed = self._counter.completed
         
         return {
-            'active_tasks': active_count,
-            'completed_tasks': completed_count,
-            'total_tasks': len(self._futures),
+            'active_tasks': submitted - completed,
+            'completed_tasks': completed,
+            'total_tasks': submitted,
             'is_shutdown': self._shutdown
         }
 
 
+def _wake_events(*events: threading.Event):
+    """置位所有事件，唤醒阻塞在其上的处理线程"""
+    for event in events:
+        event.set()
+
+
+def _batch_process_loop(manager_ref, have_update: threading.Event,
+                        batch_full: threading.Event):
+    """
+    批处理循环：空闲时阻塞等待，不做周期性唤醒
+    
+    线程只持有管理器的弱引用，等待期间不保留强引用；管理器被回收后
+    finalize 会置位事件唤醒线程，线程随即退出，不依赖显式调用 stop()
+    """
+    while True:
+        have_update.wait()
+        manager = manager_ref()
+        if manager is None or not manager._running:
+            break
+        interval = manager._batch_interval
+        del manager
+        
+        # 在批处理间隔内合并后续更新
+        batch_full.wait(interval)
+        manager = manager_ref()
+        if manager is None or not manager._running:
+            break
+        manager._process_pending()
+        del manager
+
+
 class BatchUpdateManager:
     """
     批量更新管理器
     合并频繁的更新请求，减少UI刷新频率
+    
+    只保留最新一次更新：add_update 覆盖“最新值”槽位并通过 Event 唤醒处理线程，
+    处理线程在批处理间隔内合并后续更新，再以最新值执行一次回调
     """
     
     def __init__(self, batch_interval: float = 0.5, max_batch_size: int = 10):
-        self._queue = queue.Queue()
         self._batch_interval = batch_interval
         self._max_batch_size = max_batch_size
         self._processor_thread = None
         self._running = False
         self._update_callback = None
         self._lock = threading.Lock()
-        self._last_update_time = 0
-        self._pending_updates = []
+        
+        # 最新的待处理更新，以及自上次处理以来合并的更新数
+        self._latest: Any = None
+        self._pending_count = 0
+        # 有待处理更新时置位
+        self._have_update = threading.Event()
+        # 合并的更新数达到 max_batch_size 或停止时置位，提前结束合并窗口
+        self._batch_full = threading.Event()
+        # 统计：已执行的回调次数与累计合并的更新数
+        self._batches_processed = 0
+        self._updates_coalesced = 0
+        # 管理器被回收时唤醒处理线程
+        self._finalizer = weakref.finalize(
+            self, _wake_events, self._have_update, self._batch_full
+        )
         
         logger.info(f"BatchUpdateManager 初始化: 批处理间隔={batch_interval}秒, "
                    f"最大批次={max_batch_size}")
@@ -253,8 +410,11 @@ class BatchUpdateManager:
             
             self._update_callback = update_callback
             self._running = True
+            self._have_update.clear()
+            self._batch_full.clear()
             self._processor_thread = threading.Thread(
-                target=self._process_loop,
+                target=_batch_process_loop,
+                args=(weakref.ref(self), self._have_update, self._batch_full),
                 daemon=True,
                 name="BatchUpdateProcessor"
             )
@@ -268,87 +428,71 @@ class BatchUpdateManager:
             self._running = False
         
         if self._processor_thread:
-            # 发送停止信号
-            self._queue.put(None)
+            # 唤醒处理线程使其退出
+            self._have_update.set()
+            self._batch_full.set()
             self._processor_thread.join(timeout=2)
             
         logger.info("批量更新管理器已停止")
     
     def add_update(self, data: Any):
-        """添加更新到队列"""
+        """添加更新（覆盖尚未处理的旧更新）"""
         if not self._running:
             logger.warning("批量更新管理器未运行，忽略更新")
             return
         
+        with self._lock:
+            self._latest = data
+            self._pending_count += 1
+            if self._pending_count >= self._max_batch_size:
+                self._batch_full.set()
+        self._have_update.set()
+    
+    def _take_latest(self):
+        """取出最新的待处理更新"""
+        with self._lock:
+            data, count = self._latest, self._pending_count
+            self._latest = None
+            self._pending_count = 0
+            self._have_update.clear()
+            self._batch_full.clear()
+        return data, count
+    
+    def _process_pending(self):
+        """以最新的待处理更新执行一次回调"""
+        data, count = self._take_latest()
+        if count == 0 or not self._update_callback:
+            return
+        
+        self._batches_processed += 1
+        if count > 1:
+            self._updates_coalesced += count - 1
+            logger.debug("批处理合并 %d 个更新为 1 个", count)
+        
         try:
-            self._queue.put(data, block=False)
-            logger.debug(f"添加更新到批处理队列，当前队列大小: {self._queue.qsize()}")
-        except queue.Full:
-            logger.warning("批处理队列已满，丢弃更新")
-    
-    def _process_loop(self):
-        """批处理循环"""
-        while self._running:
-            batch = []
-            deadline = time.time() + self._batch_interval
-            
-            # 收集批次
-            while time.time() < deadline and len(batch) < self._max_batch_size:
-                try:
-                    timeout = deadline - time.time()
-                    if timeout > 0:
-                        item = self._queue.get(timeout=timeout)
-                        if item is None:  # 停止信号
-                            break
-                        batch.append(item)
-                except queue.Empty:
-                    break
-            
-            # 处理批次
-            if batch and self._update_callback:
-                try:
-                    # 只处理最新的数据（去重）
-                    if len(batch) > 1:
-                        # 保留最新的更新
-                        latest_data = batch[-1]
-                        logger.debug(f"批处理合并 {len(batch)} 个更新为 1 个")
-                    else:
-                        latest_data = batch[0]
-                    
-                    # 执行回调
-                    self._update_callback(latest_data)
-                    
-                except Exception as e:
-                    logger.error(f"批处理更新失败: {e}")
+            self._update_callback(data)
+        except Exception as e:
+            logger.error(f"批处理更新失败: {e}")
     
     def flush(self):
-        """立即处理所有待处理的更新"""
-        batch = []
+        """立即处理待处理的更新"""
+        data, count = self._take_latest()
         
-        # 收集所有待处理项
-        while not self._queue.empty():
-            try:
-                item = self._queue.get_nowait()
-                if item is not None:
-                    batch.append(item)
-            except queue.Empty:
-                break
-        
-        # 处理批次
-        if batch and self._update_callback:
+        if count and self._update_callback:
             try:
-                latest_data = batch[-1]
-                self._update_callback(latest_data)
-                logger.debug(f"强制刷新 {len(batch)} 个更新")
+                self._update_callback(data)
+                logger.debug("强制刷新 %d 个更新", count)
             except Exception as e:
                 logger.error(f"强制刷新失败: {e}")
     
     def get_stats(self) -> Dict[str, Any]:
         """获取统计信息"""
         return {
-            'queue_size': self._queue.qsize(),
+            'queue_size': self._pending_count,
             'batch_interval': self._batch_interval,
             'max_batch_size': self._max_batch_size,
+            'batches_processed': self._batches_processed,
+            'updates_coalesced': self._updates_coalesced,
             'is_running': self._running
         }
 
@@ -359,25 +503,10 @@ class PerformanceOptimizer:
     整合所有优化功能
     """
     
-    _instance = None
-    _lock = threading.Lock()
-    
-    def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
-    
     def __init__(self):
-        if self._initialized:
-            return
-        
-        self._initialized = True
-        
         # 初始化各个优化组件
-        self.icon_cache = IconCache(max_cache_size=50)
+        # 完整图标集约 300 个（32x32 RGBA 每个约 4KB），容量 512 时内存上限约 2MB，常驻不淘汰
+        self.icon_cache = IconCache(max_cache_size=512)
         self.thread_pool = ManagedThreadPool(max_workers=3)
         self.batch_manager = BatchUpdateManager(
             batch_interval=0.5,
@@ -388,13 +517,21 @@ class PerformanceOptimizer:
     
     @classmethod
     def get_instance(cls) -> 'PerformanceOptimizer':
-        """获取单例实例"""
-        return cls()
+        """获取单例实例（首次调用时创建）"""
+        instance = _optimizer
+        if instance is None:
+            instance = _create_optimizer()
+        return instance
     
-    def shutdown(self):
-        """关闭所有优化组件"""
+    def shutdown(self, wait: bool = True):
+        """
+        关闭所有优化组件
+        
+        Args:
+            wait: 是否等待线程池中的任务完成；为 False 时取消排队中的任务并立即返回
+        """
         self.batch_manager.stop()
-        self.thread_pool.shutdown()
+        self.thread_pool.shutdown(wait=wait, cancel_futures=not wait)
         self.icon_cache.clear()
         logger.info("PerformanceOptimizer 已关闭")
     
@@ -404,4 +541,18 @@ class PerformanceOptimizer:
             'icon_cache': self.icon_cache.get_stats(),
             'thread_pool': self.thread_pool.get_stats(),
             'batch_manager': self.batch_manager.get_stats()
-        }
\ No newline at end of file
+        }
+
+
+# 全局优化器实例，由 PerformanceOptimizer.get_instance() 惰性创建
+_optimizer: Optional[PerformanceOptimizer] = None
+_optimizer_lock = threading.Lock()
+
+
+def _create_optimizer() -> PerformanceOptimizer:
+    """创建全局优化器（加锁并再次检查，避免并发时重复创建线程池）"""
+    global _optimizer
+    with _optimizer_lock:
+        if _optimizer is None:
+            _optimizer = PerformanceOptimizer()
+        return _optimizer
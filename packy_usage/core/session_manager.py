@@ -4,46 +4,63 @@ HTTP 会话管理器
 """
 
 import asyncio
+import atexit
+import socket
 import threading
-from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
-
-import aiohttp
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Optional, Dict, Any, TYPE_CHECKING
 
 from ..utils.logger import get_logger
 
+if TYPE_CHECKING:
+    import aiohttp
+    import requests
+
 logger = get_logger(__name__)
 
 
-class SessionManager:
+@lru_cache(maxsize=None)
+def _keepalive_adapter_class():
     """
-    单例模式的 HTTP 会话管理器
-    提供同步和异步两种会话管理
+    构建启用 TCP Keep-Alive 的 HTTPAdapter 子类（首次使用时才导入 requests）
+    
+    在 urllib3 默认套接字选项（已包含 TCP_NODELAY）之上开启 SO_KEEPALIVE，
+    使连接池中空闲的连接能及时发现被对端或中间设备断开，避免复用失效连接
     """
+    from requests.adapters import HTTPAdapter
+    from urllib3.connection import HTTPConnection
+    
+    socket_options = HTTPConnection.default_socket_options + [
+        (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1),
+    ]
     
-    _instance = None
-    _lock = threading.Lock()
+    class KeepAliveAdapter(HTTPAdapter):
+        def init_poolmanager(self, *args, **kwargs):
+            kwargs.setdefault('socket_options', socket_options)
+            super().init_poolmanager(*args, **kwargs)
+        
+        def proxy_manager_for(self, proxy, **proxy_kwargs):
+            proxy_kwargs.setdefault('socket_options', socket_options)
+            return super().proxy_manager_for(proxy, **proxy_kwargs)
     
-    def __new__(cls):
-        if cls._instance is None:
-            with cls._lock:
-                if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
-        return cls._instance
+    return KeepAliveAdapter
+
+
+class SessionManager:
+    """
+    单例模式的 HTTP 会话管理器（通过 get_instance() 获取）
+    提供同步和异步两种会话管理
+    """
     
     def __init__(self):
-        if self._initialized:
-            return
-            
-        self._initialized = True
-        self._sync_session: Optional[requests.Session] = None
-        self._async_session: Optional[aiohttp.ClientSession] = None
+        self._sync_session: Optional['requests.Session'] = None
+        self._async_session: Optional['aiohttp.ClientSession'] = None
         self._session_lock = threading.Lock()
         self._async_lock = asyncio.Lock()
+        # 限制异步请求并发数，与异步会话一同在其事件循环中创建
+        self._async_semaphore: Optional[asyncio.Semaphore] = None
         
         # 连接池配置
         self.pool_connections = 10
@@ -51,17 +68,30 @@ class SessionManager:
         self.max_retries = 3
         self.timeout = 10
         
-        # 缓存配置
-        self._cache: Dict[str, tuple] = {}
-        self._cache_ttl = timedelta(seconds=30)
+        # 缓存配置：值为 (数据, 写入时间 time.monotonic())，按访问顺序排列（LRU）
+        self._cache: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._cache_ttl = 30.0  # 秒
+        self._max_cache_entries = 256
+        # 每写入若干次才执行一次完整的过期扫描
+        self._cleanup_interval = 32
+        self._writes_since_cleanup = 0
+        # 缓存可能被轮询线程和 UI 线程同时访问
+        self._cache_lock = threading.Lock()
+        
+        # 单例与其会话存活到进程结束，析构函数不可靠，改为退出时清理
+        atexit.register(self._atexit_cleanup)
         
         logger.info("SessionManager 初始化完成")
     
-    def get_sync_session(self) -> requests.Session:
+    def get_sync_session(self) -> 'requests.Session':
         """
         获取同步 HTTP 会话（线程安全）
         使用连接池和重试机制
         """
+        # HTTP 库在首次创建会话时才导入，缩短 CLI 启动时间
+        import requests
+        from urllib3.util.retry import Retry
+        
         with self._session_lock:
             if self._sync_session is None:
                 logger.info("创建新的同步 HTTP 会话")
@@ -77,11 +107,12 @@ class SessionManager:
                     allowed_methods=["HEAD", "GET", "OPTIONS", "POST"]
                 )
                 
-                # 配置连接池适配器
-                adapter = HTTPAdapter(
+                # 配置连接池适配器：连接池满时不阻塞，临时新建连接
+                adapter = _keepalive_adapter_class()(
                     pool_connections=self.pool_connections,
                     pool_maxsize=self.pool_maxsize,
-                    max_retries=retry_strategy
+                    max_retries=retry_strategy,
+                    pool_block=False
                 )
                 
                 # 挂载适配器
@@ -102,20 +133,22 @@ class SessionManager:
             
             return self._sync_session
     
-    async def get_async_session(self) -> aiohttp.ClientSession:
+    async def get_async_session(self) -> 'aiohttp.ClientSession':
         """
         获取异步 HTTP 会话（协程安全）
         使用连接池和持久连接
         """
+        import aiohttp
+        
         if self._async_session is None or self._async_session.closed:
             async with self._async_lock:
                 if self._async_session is None or self._async_session.closed:
                     logger.info("创建新的异步 HTTP 会话")
                     
-                    # 配置连接器
+                    # 配置连接器：只访问单一 API 主机，总连接数与单主机连接数一致
                     connector = aiohttp.TCPConnector(
-                        limit=100,  # 总连接数限制
-                        limit_per_host=30,  # 每个主机的连接数限制
+                        limit=self.pool_maxsize,  # 总连接数限制
+                        limit_per_host=self.pool_maxsize,  # 每个主机的连接数限制
                         ttl_dns_cache=300,  # DNS 缓存时间
                         enable_cleanup_closed=True,  # 自动清理关闭的连接
                         keepalive_timeout=30,  # Keep-Alive 超时
@@ -141,10 +174,23 @@ class SessionManager:
                         }
                     )
                     
+                    self._async_semaphore = asyncio.Semaphore(self.pool_maxsize)
+                    
                     logger.debug("异步会话创建完成，启用连接池和持久连接")
         
         return self._async_session
     
+    def async_request_slot(self) -> asyncio.Semaphore:
+        """
+        获取异步请求并发槽位（需先调用 get_async_session）
+        
+        Returns:
+            容量为 pool_maxsize 的信号量，超出的并发请求在协程内排队而不占用连接
+        """
+        if self._async_semaphore is None:
+            self._async_semaphore = asyncio.Semaphore(self.pool_maxsize)
+        return self._async_semaphore
+    
     def get_cached_data(self, cache_key: str) -> Optional[Any]:
         """
         从缓存获取数据
@@ -155,16 +201,21 @@ class SessionManager:
         Returns:
             缓存的数据，如果存在且未过期；否则返回 None
         """
-        if cache_key in self._cache:
-            data, timestamp = self._cache[cache_key]
-            if datetime.now() - timestamp < self._cache_ttl:
-                logger.debug(f"缓存命中: {cache_key}")
+        with self._cache_lock:
+            entry = self._cache.get(cache_key)
+            if entry is None:
+                return None
+            
+            data, timestamp = entry
+            if time.monotonic() - timestamp < self._cache_ttl:
+                self._cache.move_to_end(cache_key)
+                logger.debug("缓存命中: %s", cache_key)
                 return data
-            else:
-                # 清理过期缓存
-                del self._cache[cache_key]
-                logger.debug(f"缓存过期: {cache_key}")
+            
+            # 清理过期缓存
+            del self._cache[cache_key]
         
+        logger.debug("缓存过期: %s", cache_key)
         return None
     
     def set_cached_data(self, cache_key: str, data: Any):
@@ -175,15 +226,25 @@ class SessionManager:
             cache_key: 缓存键
             data: 要缓存的数据
         """
-        self._cache[cache_key] = (data, datetime.now())
-        logger.debug(f"缓存设置: {cache_key}")
+        with self._cache_lock:
+            self._cache[cache_key] = (data, time.monotonic())
+            self._cache.move_to_end(cache_key)
+            
+            # 定期清理过期项
+            self._writes_since_cleanup += 1
+            if self._writes_since_cleanup >= self._cleanup_interval:
+                self._cleanup_cache()
+            
+            # 超出容量时淘汰最久未使用的项
+            while len(self._cache) > self._max_cache_entries:
+                self._cache.popitem(last=False)
         
-        # 清理过旧的缓存（保持缓存大小）
-        self._cleanup_cache()
+        logger.debug("缓存设置: %s", cache_key)
     
     def _cleanup_cache(self):
-        """清理过期的缓存项"""
-        now = datetime.now()
+        """清理过期的缓存项（调用方需持有缓存锁）"""
+        self._writes_since_cleanup = 0
+        now = time.monotonic()
         expired_keys = [
             key for key, (_, timestamp) in self._cache.items()
             if now - timestamp >= self._cache_ttl
@@ -193,11 +254,12 @@ class SessionManager:
             del self._cache[key]
         
         if expired_keys:
-            logger.debug(f"清理了 {len(expired_keys)} 个过期缓存项")
+            logger.debug("清理了 %d 个过期缓存项", len(expired_keys))
     
     def clear_cache(self):
         """清空所有缓存"""
-        self._cache.clear()
+        with self._cache_lock:
+            self._cache.clear()
         logger.info("缓存已清空")
     
     def close_sync_session(self):
@@ -212,22 +274,29 @@ class SessionManager:
         if self._async_session and not self._async_session.closed:
             await self._async_session.close()
             self._async_session = None
+            self._async_semaphore = None
             logger.info("异步会话已关闭")
     
-    def __del__(self):
-        """析构函数，确保会话被正确关闭"""
-        try:
-            self.close_sync_session()
-            # 异步会话需要在事件循环中关闭
-            if self._async_session and not self._async_session.closed:
-                asyncio.create_task(self.close_async_session())
-        except:
-            pass
+    def _atexit_cleanup(self):
+        """进程退出时关闭会话，释放连接和套接字"""
+        self.close_sync_session()
+        
+        # 退出时通常已没有运行中的事件循环，不能再 create_task；
+        # 用一个临时事件循环执行关闭协程（原循环已关闭时连接器只标记关闭状态）
+        session, self._async_session = self._async_session, None
+        if session is not None and not session.closed:
+            try:
+                asyncio.run(session.close())
+            except Exception as e:
+                logger.debug("退出时关闭异步会话失败: %s", e)
     
     @classmethod
     def get_instance(cls) -> 'SessionManager':
-        """获取单例实例"""
-        return cls()
+        """获取单例实例（首次调用时创建）"""
+        instance = _session_manager
+        if instance is None:
+            instance = _create_session_manager()
+        return instance
     
     def get_stats(self) -> Dict[str, Any]:
         """
@@ -240,7 +309,8 @@ class SessionManager:
             'sync_session_active': self._sync_session is not None,
             'async_session_active': self._async_session is not None and not self._async_session.closed,
             'cache_size': len(self._cache),
-            'cache_ttl_seconds': self._cache_ttl.total_seconds(),
+            'max_cache_entries': self._max_cache_entries,
+            'cache_ttl_seconds': self._cache_ttl,
             'pool_connections': self.pool_connections,
             'pool_maxsize': self.pool_maxsize
         }
@@ -251,4 +321,18 @@ class SessionManager:
             if connector:
                 stats['async_connections'] = len(connector._conns) if hasattr(connector, '_conns') else 0
         
-        return stats
\ No newline at end of file
+        return stats
+
+
+# 单例实例：创建后的访问只需一次全局变量读取，不再每次经过 __new__/__init__
+_session_manager: Optional[SessionManager] = None
+_session_manager_lock = threading.Lock()
+
+
+def _create_session_manager() -> SessionManager:
+    """在锁内创建单例实例"""
+    global _session_manager
+    with _session_manager_lock:
+        if _session_manager is None:
+            _session_manager = SessionManager()
+        return _session_manager
@@ -4,14 +4,17 @@ Token 安全存储管理器
 """
 
 import json
+import time
+import threading
 import base64
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from datetime import datetime, timezone
 from enum import Enum
 
 import keyring
 from keyring.errors import KeyringError
 
+from ..utils import json_codec
 from ..utils.logger import get_logger
 from ..utils.exceptions import SecurityError
 
@@ -32,20 +35,98 @@ class TokenManager:
     TOKEN_KEY = "api_token" 
     TOKEN_META_KEY = "token_metadata"
     
+    # 从密钥环读取的结果缓存时间（秒），合并轮询期间的频繁读取
+    KEYRING_CACHE_TTL = 5.0
+    
+    # 密钥环后端检查每个进程只执行一次
+    _keyring_checked = False
+    _keyring_check_lock = threading.Lock()
+    
     def __init__(self):
+        # (读取时间, token)
+        self._token_cache: Optional[Tuple[float, Optional[str]]] = None
+        # (读取时间, 元数据, 过期时间)
+        self._metadata_cache: Optional[Tuple[float, Optional[Dict[str, Any]], Optional[datetime]]] = None
+        # token -> (类型, JWT 过期时间)，Token 内容不变，解析结果可一直复用
+        self._decoded_cache: Dict[str, Tuple[TokenType, Optional[datetime]]] = {}
         self._validate_keyring()
     
-    def _validate_keyring(self):
-        """验证密钥环是否可用"""
+    @classmethod
+    def _validate_keyring(cls):
+        """
+        检查密钥环后端是否可用
+        
+        只检查当前选用的后端，不做读写往返：系统密钥环首次访问可能阻塞甚至弹出授权提示，
+        实际的读写错误由各操作自行捕获处理
+        """
+        with cls._keyring_check_lock:
+            if cls._keyring_checked:
+                return
+            cls._keyring_checked = True
+        
         try:
-            # 测试密钥环功能
-            test_key = f"{self.SERVICE_NAME}_test"
-            keyring.set_password(self.SERVICE_NAME, test_key, "test")
-            keyring.delete_password(self.SERVICE_NAME, test_key)
-            logger.debug("密钥环功能正常")
-        except KeyringError as e:
+            from keyring.backends import fail
+            backend = keyring.get_keyring()
+            if isinstance(backend, fail.Keyring):
+                logger.warning("密钥环不可用：未找到可用的密钥环后端")
+            else:
+                logger.debug(f"密钥环后端: {type(backend).__name__}")
+        except Exception as e:
             logger.warning(f"密钥环不可用，将使用备用存储: {e}")
     
+    def _invalidate_cache(self):
+        """丢弃缓存的 Token 及其元数据"""
+        self._token_cache = None
+        self._metadata_cache = None
+        self._decoded_cache.clear()
+    
+    def _read_token(self) -> Optional[str]:
+        """从密钥环读取 Token（短时间内复用上次读取结果）"""
+        cached = self._token_cache
+        now = time.monotonic()
+        if cached and now - cached[0] < self.KEYRING_CACHE_TTL:
+            return cached[1]
+        
+        token = keyring.get_password(self.SERVICE_NAME, self.TOKEN_KEY)
+        self._token_cache = (now, token)
+        return token
+    
+    def _read_metadata(self) -> Tuple[Optional[Dict[str, Any]], Optional[datetime]]:
+        """
+        从密钥环读取并解析 Token 元数据（短时间内复用上次读取结果）
+        
+        Returns:
+            (元数据字典, 过期时间)，不存在时为 (None, None)
+        """
+        cached = self._metadata_cache
+        now = time.monotonic()
+        if cached and now - cached[0] < self.KEYRING_CACHE_TTL:
+            return cached[1], cached[2]
+        
+        metadata_str = keyring.get_password(self.SERVICE_NAME, self.TOKEN_META_KEY)
+        metadata = json.loads(metadata_str) if metadata_str else None
+        
+        expires_at = None
+        expires_at_str = metadata.get("expires_at") if metadata else None
+        if expires_at_str:
+            expires_at = datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
+        
+        self._metadata_cache = (now, metadata, expires_at)
+        return metadata, expires_at
+    
+    def _decode(self, token: str) -> Tuple[TokenType, Optional[datetime]]:
+        """解析 Token 类型和 JWT 过期时间，结果按 Token 缓存"""
+        decoded = self._decoded_cache.get(token)
+        if decoded is None:
+            if token.startswith("sk-"):
+                decoded = (TokenType.API_KEY, None)
+            elif self._is_jwt_format(token):
+                decoded = (TokenType.JWT, self._parse_jwt_expiration(token))
+            else:
+                decoded = (TokenType.UNKNOWN, None)
+            self._decoded_cache[token] = decoded
+        return decoded
+    
     def save_token(self, token: str) -> bool:
         """
         保存Token到安全存储
@@ -79,6 +160,7 @@ class TokenManager:
                     metadata["expires_at"] = exp_time.isoformat()
             
             # 保存Token和元数据
+            self._invalidate_cache()
             keyring.set_password(self.SERVICE_NAME, self.TOKEN_KEY, token)
             keyring.set_password(self.SERVICE_NAME, self.TOKEN_META_KEY, json.dumps(metadata))
             
@@ -100,7 +182,7 @@ class TokenManager:
             Optional[str]: Token字符串，如果不存在返回None
         """
         try:
-            token = keyring.get_password(self.SERVICE_NAME, self.TOKEN_KEY)
+            token = self._read_token()
             
             if not token:
                 logger.debug("未找到存储的Token")
@@ -129,6 +211,8 @@ class TokenManager:
             bool: 删除是否成功
         """
         try:
+            self._invalidate_cache()
+            
             # 删除Token
             try:
                 keyring.delete_password(self.SERVICE_NAME, self.TOKEN_KEY)
@@ -156,11 +240,10 @@ class TokenManager:
             TokenType: Token类型
         """
         try:
-            metadata_str = keyring.get_password(self.SERVICE_NAME, self.TOKEN_META_KEY)
-            if not metadata_str:
+            metadata, _ = self._read_metadata()
+            if not metadata:
                 return TokenType.UNKNOWN
             
-            metadata = json.loads(metadata_str)
             return TokenType(metadata.get("type", TokenType.UNKNOWN.value))
             
         except Exception as e:
@@ -175,12 +258,10 @@ class TokenManager:
             Optional[Dict]: Token信息，包括类型、创建时间等
         """
         try:
-            metadata_str = keyring.get_password(self.SERVICE_NAME, self.TOKEN_META_KEY)
-            if not metadata_str:
+            metadata, _ = self._read_metadata()
+            if not metadata:
                 return None
             
-            metadata = json.loads(metadata_str)
-            
             # 添加当前状态信息
             info = metadata.copy()
             info["exists"] = self.get_token() is not None
@@ -208,22 +289,12 @@ class TokenManager:
         if not token:
             return None
         
-        token_type = self._detect_token_type(token)
-        
-        if token_type == TokenType.JWT:
-            return self._extract_jwt_expiration(token)
-        
         # API Key没有过期时间
-        return None
+        return self._decode(token)[1]
     
     def _detect_token_type(self, token: str) -> TokenType:
         """检测Token类型"""
-        if token.startswith("sk-"):
-            return TokenType.API_KEY
-        elif self._is_jwt_format(token):
-            return TokenType.JWT
-        else:
-            return TokenType.UNKNOWN
+        return self._decode(token)[0]
     
     def _is_jwt_format(self, token: str) -> bool:
         """检查是否为JWT格式"""
@@ -235,17 +306,19 @@ class TokenManager:
     
     def _extract_jwt_expiration(self, token: str) -> Optional[datetime]:
         """提取JWT的过期时间"""
+        return self._decode(token)[1]
+    
+    def _parse_jwt_expiration(self, token: str) -> Optional[datetime]:
+        """解析JWT payload中的过期时间"""
         try:
             parts = token.split(".")
             if len(parts) != 3:
                 return None
             
-            # 解码payload部分
+            # 解码payload部分（JWT使用去掉填充的URL-safe base64编码）
             payload_part = parts[1]
-            # JWT使用URL-safe base64编码
-            payload_part += '=' * (4 - len(payload_part) % 4)  # 添加填充
-            payload_bytes = base64.urlsafe_b64decode(payload_part.encode())
-            payload = json.loads(payload_bytes.decode())
+            payload_part += '=' * (-len(payload_part) % 4)
+            payload = json_codec.loads(base64.urlsafe_b64decode(payload_part))
             
             # 提取过期时间
             exp_timestamp = payload.get("exp")
@@ -261,18 +334,12 @@ class TokenManager:
     def _is_token_expired(self) -> bool:
         """检查Token是否过期"""
         try:
-            metadata_str = keyring.get_password(self.SERVICE_NAME, self.TOKEN_META_KEY)
-            if not metadata_str:
-                return False
-            
-            metadata = json.loads(metadata_str)
-            expires_at_str = metadata.get("expires_at")
+            _, expires_at = self._read_metadata()
             
-            if not expires_at_str:
+            if not expires_at:
                 # 没有过期时间信息，认为未过期
                 return False
             
-            expires_at = datetime.fromisoformat(expires_at_str.replace('Z', '+00:00'))
             return datetime.now(timezone.utc) >= expires_at
             
         except Exception as e:
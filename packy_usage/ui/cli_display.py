@@ -3,11 +3,13 @@
 提供各种格式的预算数据展示
 """
 
+import sys
 import json
-import time
 import asyncio
 from typing import Optional
 from datetime import datetime
+from functools import lru_cache
+from itertools import product
 
 import click
 
@@ -18,11 +20,119 @@ from ..utils.logger import get_logger
 logger = get_logger(__name__)
 
 
+def _plain(text, **styles):
+    """不添加样式，原样返回文本"""
+    return text
+
+
+# 标准输出不是终端（管道、重定向、定时任务）时 click.echo 本就会去掉 ANSI 序列，
+# 直接跳过样式化，不再构造带转义序列的字符串
+_STYLE = click.style if sys.stdout is not None and sys.stdout.isatty() else _plain
+
+# 清屏并将光标移到左上角（与 click.clear() 输出的序列相同），随帧内容一次写出
+_CLEAR_SCREEN = "\033[2J\033[1;1H"
+
+# 每次渲染都相同的文本与样式化字符串，在导入时生成一次
+_SEP50 = "=" * 50
+_SEP60 = "=" * 60
+_TITLE = "==== " + _STYLE("Packy 预算使用报告", bold=True, fg='blue') + " ===="
+
+_STATUS_COLORS = {
+    "normal": "green",
+    "notice": "blue", 
+    "warning": "yellow",
+    "critical": "red"
+}
+
+_STATUS_TEXTS = {
+    "normal": "正常",
+    "notice": "注意",
+    "warning": "警告",
+    "critical": "危险"
+}
+
+# 已知整体状态的样式化文字
+_STATUS_STYLED = {
+    status: _STYLE(text, fg=_STATUS_COLORS[status], bold=True)
+    for status, text in _STATUS_TEXTS.items()
+}
+
+_CRITICAL_MSG = _STYLE("[!] 危险 - 接近限额！", fg='red', bold=True)
+_WARNING_MSG = _STYLE("[!] 警告 - 使用率较高", fg='yellow')
+_MEDIUM_MSG = _STYLE("[i] 中等使用", fg='blue')
+_OK_MSG = _STYLE("[OK] 正常使用", fg='green')
+
+# 监控模式的双栏表头
+_WATCH_HEADER = "  " + "日预算".center(26) + " | " + "月预算".center(26)
+_WATCH_RULE = "  " + "-" * 26 + "-+-" + "-" * 26
+
+# 监控模式的状态文字及其样式
+_WATCH_CRITICAL_TEXT = "状态: ❌ 危险"
+_WATCH_WARNING_TEXT = "状态: ⚠️  警告"
+_WATCH_NORMAL_TEXT = "状态: ✅ 正常"
+_WATCH_CRITICAL = _STYLE(_WATCH_CRITICAL_TEXT, fg='red', bold=True)
+_WATCH_WARNING = _STYLE(_WATCH_WARNING_TEXT, fg='yellow', bold=True)
+_WATCH_NORMAL = _STYLE(_WATCH_NORMAL_TEXT, fg='green', bold=True)
+
+# 左栏状态单元格按可见宽度补齐到 22 列（不计 ANSI 序列），有无样式时布局一致
+_WATCH_LEFT_WIDTH = 22
+_WATCH_LEFT_CELL = {
+    styled: "  " + styled + " " * (_WATCH_LEFT_WIDTH - 2 - len(text))
+    for text, styled in (
+        (_WATCH_CRITICAL_TEXT, _WATCH_CRITICAL),
+        (_WATCH_WARNING_TEXT, _WATCH_WARNING),
+        (_WATCH_NORMAL_TEXT, _WATCH_NORMAL),
+    )
+}
+
+_ALERT_CRITICAL = _STYLE("  💥 危险警报：预算使用率过高，请立即注意！", fg='red', bold=True, blink=True)
+_ALERT_WARNING = _STYLE("  ⚠️  注意：预算使用率较高，请合理控制使用", fg='yellow', bold=True, blink=True)
+
+# 详细报告模板：固定布局只拼接一次，每次渲染仅替换数值字段
+_SECTION_TEMPLATE = (
+    "{header}\n"
+    "  {{{p}bar}} {{{p}pct:.1f}}%\n"
+    "  已使用:     ${{{p}used:.2f}}\n"
+    "  总额度:     ${{{p}total:.2f}}\n"
+    "  剩余额度:   ${{{p}remaining:.2f}}\n"
+    "  状态:       {{{p}msg}}"
+)
+_DETAILED_TEMPLATE = (
+    _TITLE + "\n" + _SEP50 + "\n"
+    "整体状态: {sicon} {stext}\n"
+    "\n"
+    + _SECTION_TEMPLATE.format(header=_STYLE("[日预算]", bold=True), p="d") + "\n"
+    "\n"
+    + _SECTION_TEMPLATE.format(header=_STYLE("[月预算]", bold=True), p="m")
+    + "{updated}"
+)
+
+# 进度条颜色，按使用率区间索引（<50%、50-75%、75-90%、>=90%）
+_BAR_COLORS = ('green', 'blue', 'yellow', 'red')
+
+
+@lru_cache(maxsize=512)
+def _cached_bar(filled: int, width: int, bucket: int) -> str:
+    """生成样式化的进度条；取值组合很少，命中后无需重新拼接 ANSI 序列"""
+    # 使用ASCII字符避免编码问题
+    return _STYLE("#" * filled + "-" * (width - filled), fg=_BAR_COLORS[bucket])
+
+
 class CliDisplay:
     """命令行显示工具"""
     
     def __init__(self):
         self.last_update = None
+        
+        # 按 (output_json, alert_only, brief) 查找显示方法；
+        # 多个选项同时开启时优先级为 JSON > 仅警告 > 简要
+        self._formatters = {
+            key: (self._show_json_format if key[0] else
+                  self._show_alerts_only if key[1] else
+                  self._show_brief_format if key[2] else
+                  self._show_detailed_format)
+            for key in product((False, True), repeat=3)
+        }
     
     def show_budget_data(
         self, 
@@ -40,18 +150,7 @@ class CliDisplay:
             output_json: JSON格式输出
             alert_only: 仅显示警告状态
         """
-        if output_json:
-            self._show_json_format(data)
-            return
-        
-        if alert_only:
-            self._show_alerts_only(data)
-            return
-        
-        if brief:
-            self._show_brief_format(data)
-        else:
-            self._show_detailed_format(data)
+        self._formatters[(bool(output_json), bool(alert_only), bool(brief))](data)
     
     def _show_json_format(self, data: BudgetData):
         """JSON格式显示"""
@@ -66,61 +165,36 @@ class CliDisplay:
                   f"{monthly_icon} 月预算: {data.monthly.percentage:.1f}%")
     
     def _show_detailed_format(self, data: BudgetData):
-        """详细格式显示"""
-        # 标题
-        click.echo("==== " + click.style("Packy 预算使用报告", bold=True, fg='blue') + " ====")
-        click.echo("=" * 50)
-        
-        # 整体状态
-        status_colors = {
-            "normal": "green",
-            "notice": "blue", 
-            "warning": "yellow",
-            "critical": "red"
-        }
-        
-        status_texts = {
-            "normal": "正常",
-            "notice": "注意",
-            "warning": "警告",
-            "critical": "危险"
-        }
-        
-        status_color = status_colors.get(data.overall_status, "white")
-        status_text = status_texts.get(data.overall_status, data.overall_status)
-        click.echo(f"整体状态: {data.status_icon} " + 
-                  click.style(status_text, fg=status_color, bold=True))
-        click.echo()
-        
-        # 日预算信息
-        self._show_usage_section("[日预算]", data.daily)
-        click.echo()
-        
-        # 月预算信息
-        self._show_usage_section("[月预算]", data.monthly)
+        """详细格式显示（按模板渲染整份报告后一次写出）"""
+        status = data.overall_status
+        status_text = _STATUS_STYLED.get(status)
+        if status_text is None:
+            status_text = _STYLE(status, fg="white", bold=True)
         
         # 更新时间
+        updated = ""
         if data.last_updated:
             update_time = data.last_updated.strftime("%Y-%m-%d %H:%M:%S")
-            click.echo(f"\n[更新时间] {update_time}")
-    
-    def _show_usage_section(self, title: str, usage: BudgetUsage):
-        """显示使用情况节"""
-        click.echo(click.style(title, bold=True))
-        
-        # 进度条
-        progress_bar = self._create_progress_bar(usage.percentage)
-        click.echo(f"  {progress_bar} {usage.percentage:.1f}%")
-        
-        # 金额信息
-        click.echo(f"  已使用:     ${usage.used:.2f}")
-        click.echo(f"  总额度:     ${usage.total:.2f}")
-        click.echo(f"  剩余额度:   ${usage.remaining:.2f}")
+            updated = f"\n\n[更新时间] {update_time}"
         
-        # 状态
-        status_msg = self._get_status_message(usage)
-        if status_msg:
-            click.echo(f"  状态:       {status_msg}")
+        daily, monthly = data.daily, data.monthly
+        click.echo(_DETAILED_TEMPLATE.format_map({
+            'sicon': data.status_icon,
+            'stext': status_text,
+            'dbar': self._create_progress_bar(daily.percentage),
+            'dpct': daily.percentage,
+            'dused': daily.used,
+            'dtotal': daily.total,
+            'dremaining': daily.remaining,
+            'dmsg': self._get_status_message(daily),
+            'mbar': self._create_progress_bar(monthly.percentage),
+            'mpct': monthly.percentage,
+            'mused': monthly.used,
+            'mtotal': monthly.total,
+            'mremaining': monthly.remaining,
+            'mmsg': self._get_status_message(monthly),
+            'updated': updated,
+        }))
     
     def _show_alerts_only(self, data: BudgetData):
         """仅显示警告状态"""
@@ -144,30 +218,30 @@ class CliDisplay:
     
     def _create_progress_bar(self, percentage: float, width: int = 20) -> str:
         """创建进度条"""
-        filled = int(percentage / 100 * width)
-        # 使用ASCII字符避免编码问题
-        bar = "#" * filled + "-" * (width - filled)
+        # 超出 0-100% 时限制填充长度，保持进度条宽度不变
+        filled = min(max(int(percentage / 100 * width), 0), width)
         
         # 根据使用率设置颜色
         if percentage >= 90:
-            return click.style(bar, fg='red')
+            bucket = 3
         elif percentage >= 75:
-            return click.style(bar, fg='yellow')
+            bucket = 2
         elif percentage >= 50:
-            return click.style(bar, fg='blue')
+            bucket = 1
         else:
-            return click.style(bar, fg='green')
+            bucket = 0
+        return _cached_bar(filled, width, bucket)
     
     def _get_status_message(self, usage: BudgetUsage) -> str:
         """获取状态消息"""
         if usage.is_critical:
-            return click.style("[!] 危险 - 接近限额！", fg='red', bold=True)
+            return _CRITICAL_MSG
         elif usage.is_warning:
-            return click.style("[!] 警告 - 使用率较高", fg='yellow')
+            return _WARNING_MSG
         elif usage.percentage >= 50:
-            return click.style("[i] 中等使用", fg='blue')
+            return _MEDIUM_MSG
         else:
-            return click.style("[OK] 正常使用", fg='green')
+            return _OK_MSG
     
     def watch_mode(self, api_client: ApiClient, interval: int = 30):
         """
@@ -180,56 +254,79 @@ class CliDisplay:
         click.echo(f">> 监控预算使用情况 (每 {interval} 秒刷新)")
         click.echo("按 Ctrl+C 停止监控\n")
         
+        try:
+            asyncio.run(self._watch_loop(api_client, interval))
+        except KeyboardInterrupt:
+            pass
+    
+    async def _watch_loop(self, api_client: ApiClient, interval: int):
+        """
+        监控循环：在同一个事件循环中异步获取数据并等待
+        
+        等待时间扣除本次请求耗时，刷新节奏固定为 interval 秒
+        """
+        loop = asyncio.get_running_loop()
         try:
             while True:
-                # 清屏（仅在非首次更新时）
-                if self.last_update:
-                    click.clear()
+                started = loop.time()
+                
+                # 清屏（仅在非首次更新时），与本帧内容合并为一次写入
+                prefix = _CLEAR_SCREEN if self.last_update else ""
                 
                 # 获取数据
                 try:
-                    data = api_client.fetch_budget_data_sync()
+                    data = await api_client.fetch_budget_data()
                     if data:
-                        self._show_watch_display(data, interval)
-                        self.last_update = datetime.now()
+                        now = datetime.now()
+                        click.echo(prefix + self._render_watch_display(data, interval, now))
+                        self.last_update = now
                     else:
-                        click.echo("[X] 无法获取预算数据")
+                        click.echo(prefix + "[X] 无法获取预算数据")
                 
                 except Exception as e:
-                    click.echo(f"[X] 错误: {e}")
+                    click.echo(prefix + f"[X] 错误: {e}")
                 
                 # 等待下次更新
-                time.sleep(interval)
-                
-        except KeyboardInterrupt:
-            pass
+                await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+        finally:
+            # 异步会话绑定在当前事件循环上，循环结束前关闭
+            await api_client.session_manager.close_async_session()
     
-    def _show_watch_display(self, data: BudgetData, interval: int):
+    def _show_watch_display(self, data: BudgetData, interval: int,
+                            now: Optional[datetime] = None):
         """监控模式下的显示格式"""
-        now = datetime.now().strftime("%H:%M:%S")
+        click.echo(self._render_watch_display(data, interval, now))
+    
+    def _render_watch_display(self, data: BudgetData, interval: int,
+                              now: Optional[datetime] = None) -> str:
+        """渲染监控模式的一帧，返回完整文本（now 为本帧时间，默认取当前时间）"""
+        if now is None:
+            now = datetime.now()
+        lines = []
 
         # 标题行
-        title = f"Packy 预算监控 - {now} (刷新间隔: {interval}秒)"
-        click.echo("\n" + "=" * 60)
-        click.echo(click.style(f"  {title}", bold=True, fg='cyan'))
-        click.echo("=" * 60)
+        title = (f"Packy 预算监控 - {now.hour:02d}:{now.minute:02d}:{now.second:02d} "
+                 f"(刷新间隔: {interval}秒)")
+        lines.append("\n" + _SEP60)
+        lines.append(_STYLE(f"  {title}", bold=True, fg='cyan'))
+        lines.append(_SEP60)
 
         # 紧凑的双栏显示
         daily = data.daily
         monthly = data.monthly
 
         # 计算对齐宽度
-        click.echo()
-        click.echo("  " + "日预算".center(26) + " | " + "月预算".center(26))
-        click.echo("  " + "-" * 26 + "-+-" + "-" * 26)
+        lines.append("")
+        lines.append(_WATCH_HEADER)
+        lines.append(_WATCH_RULE)
 
         # 进度条
         daily_bar = self._create_progress_bar(daily.percentage, 20)
         monthly_bar = self._create_progress_bar(monthly.percentage, 20)
 
-        click.echo(f"  {daily_bar} | {monthly_bar}")
-        click.echo(f"  {daily.percentage:>6.1f}% 已使用{' ' * 14} | {monthly.percentage:>6.1f}% 已使用")
-        click.echo()
+        lines.append(f"  {daily_bar} | {monthly_bar}")
+        lines.append(f"  {daily.percentage:>6.1f}% 已使用{' ' * 14} | {monthly.percentage:>6.1f}% 已使用")
+        lines.append("")
 
         # 金额信息 - 更清晰的格式
         daily_used_str = f"${daily.used:,.2f}"
@@ -237,63 +334,52 @@ class CliDisplay:
         monthly_used_str = f"${monthly.used:,.2f}"
         monthly_total_str = f"${monthly.total:,.2f}"
 
-        click.echo(f"  已使用: {daily_used_str:>10}{' ' * 8} | 已使用: {monthly_used_str:>10}")
-        click.echo(f"  总额度: {daily_total_str:>10}{' ' * 8} | 总额度: {monthly_total_str:>10}")
-        click.echo(f"  剩余额: ${daily.remaining:>9,.2f}{' ' * 8} | 剩余额: ${monthly.remaining:>9,.2f}")
-        click.echo()
+        lines.append(f"  已使用: {daily_used_str:>10}{' ' * 8} | 已使用: {monthly_used_str:>10}")
+        lines.append(f"  总额度: {daily_total_str:>10}{' ' * 8} | 总额度: {monthly_total_str:>10}")
+        lines.append(f"  剩余额: ${daily.remaining:>9,.2f}{' ' * 8} | 剩余额: ${monthly.remaining:>9,.2f}")
+        lines.append("")
 
         # 状态指示 - 居中对齐
-        if daily.is_critical:
-            daily_status = "❌ 危险"
-            daily_color = 'red'
-        elif daily.is_warning:
-            daily_status = "⚠️  警告"
-            daily_color = 'yellow'
-        else:
-            daily_status = "✅ 正常"
-            daily_color = 'green'
-
-        if monthly.is_critical:
-            monthly_status = "❌ 危险"
-            monthly_color = 'red'
-        elif monthly.is_warning:
-            monthly_status = "⚠️  警告"
-            monthly_color = 'yellow'
-        else:
-            monthly_status = "✅ 正常"
-            monthly_color = 'green'
-
-        daily_status_colored = click.style(f"状态: {daily_status}", fg=daily_color, bold=True)
-        monthly_status_colored = click.style(f"状态: {monthly_status}", fg=monthly_color, bold=True)
+        daily_status_colored = self._get_watch_status(daily)
+        monthly_status_colored = self._get_watch_status(monthly)
 
         # 计算填充以居中
-        status_line = f"  {daily_status_colored}".ljust(35) + " | " + f"{monthly_status_colored}"
-        click.echo(status_line)
+        status_line = _WATCH_LEFT_CELL[daily_status_colored] + " | " + monthly_status_colored
+        lines.append(status_line)
 
         # 底部分隔线
-        click.echo("=" * 60)
+        lines.append(_SEP60)
 
         # 提示信息
-        if data.overall_status in ["warning", "critical"]:
-            if data.overall_status == "critical":
-                alert_msg = "💥 危险警报：预算使用率过高，请立即注意！"
-                alert_color = 'red'
-            else:
-                alert_msg = "⚠️  注意：预算使用率较高，请合理控制使用"
-                alert_color = 'yellow'
-            click.echo()
-            click.echo(click.style(f"  {alert_msg}", fg=alert_color, bold=True, blink=True))
+        if data.overall_status == "critical":
+            lines.append("")
+            lines.append(_ALERT_CRITICAL)
+        elif data.overall_status == "warning":
+            lines.append("")
+            lines.append(_ALERT_WARNING)
+
+        return "\n".join(lines)
+    
+    @staticmethod
+    def _get_watch_status(usage: BudgetUsage) -> str:
+        """获取监控模式下的样式化状态文字"""
+        if usage.is_critical:
+            return _WATCH_CRITICAL
+        elif usage.is_warning:
+            return _WATCH_WARNING
+        return _WATCH_NORMAL
     
     def show_error(self, message: str, suggestion: Optional[str] = None):
         """显示错误信息"""
+        # 写到 stderr，是否着色由 click 按 stderr 判断
         click.echo(click.style(f"[X] {message}", fg='red'), err=True)
         if suggestion:
             click.echo(click.style(f"[!] {suggestion}", fg='yellow'), err=True)
     
     def show_success(self, message: str):
         """显示成功信息"""
-        click.echo(click.style(f"[OK] {message}", fg='green'))
+        click.echo(_STYLE(f"[OK] {message}", fg='green'))
     
     def show_warning(self, message: str):
         """显示警告信息"""
-        click.echo(click.style(f"[!] {message}", fg='yellow'))
\ No newline at end of file
+        click.echo(_STYLE(f"[!] {message}", fg='yellow'))
\ No newline at end of file
@@ -4,16 +4,22 @@
 """
 
 import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, Set, Optional
-
-from plyer import notification
+from typing import Dict, Set, Optional, Tuple
 
 from ..config.manager import ConfigManager, NotificationConfig
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
+# 常见的英文通知错误及对应的中文说明，按顺序匹配
+_ERR_MAP = (
+    ("No usable implementation found", "通知系统不可用 (缺少必要的系统组件)"),
+    ("No module named 'plyer.platforms'", "通知库模块缺失 (plyer.platforms)"),
+    ("Permission denied", "通知权限被拒绝"),
+)
+
 
 class NotificationManager:
     """通知管理器"""
@@ -22,28 +28,32 @@ class NotificationManager:
         self.config = config
         self.notification_config = config.get_notification_config()
         
-        # 通知去重，防止重复通知
-        self.recent_notifications: Dict[str, datetime] = {}
+        # 通知去重，防止重复通知；按发送时间先后排列，最早的在最前
+        self.recent_notifications: 'OrderedDict[str, datetime]' = OrderedDict()
         self.notification_cooldown = timedelta(minutes=5)  # 5分钟冷却时间
         
         # 静默时间检查
         self.quiet_hours_active = False
+        # 免打扰时段（当天的分钟数），配置变化时重新解析
+        self._qh_start, self._qh_end = self._parse_quiet_hours()
+        # (分钟桶, 是否处于免打扰时段)，同一分钟内直接复用结果
+        self._qh_cache: Tuple[int, bool] = (-1, False)
     
-    def send_info(self, title: str, message: str, timeout: int = 5):
-        """发送信息通知"""
-        self._send_notification(title, message, "info", timeout)
+    def send_info(self, title: str, message: str, timeout: int = 5) -> bool:
+        """发送信息通知，返回是否实际发出"""
+        return self._send_notification(title, message, "info", timeout)
     
-    def send_warning_alert(self, title: str, message: str, timeout: int = 10):
-        """发送警告通知"""
-        self._send_notification(title, message, "warning", timeout)
+    def send_warning_alert(self, title: str, message: str, timeout: int = 10) -> bool:
+        """发送警告通知，返回是否实际发出"""
+        return self._send_notification(title, message, "warning", timeout)
     
-    def send_critical_alert(self, title: str, message: str, timeout: int = 15):
-        """发送严重警告通知"""
-        self._send_notification(title, message, "critical", timeout)
+    def send_critical_alert(self, title: str, message: str, timeout: int = 15) -> bool:
+        """发送严重警告通知，返回是否实际发出"""
+        return self._send_notification(title, message, "critical", timeout)
     
-    def send_error(self, title: str, message: str, timeout: int = 10):
-        """发送错误通知"""
-        self._send_notification(title, message, "error", timeout)
+    def send_error(self, title: str, message: str, timeout: int = 10) -> bool:
+        """发送错误通知，返回是否实际发出"""
+        return self._send_notification(title, message, "error", timeout)
     
     def _send_notification(
         self, 
@@ -51,7 +61,7 @@ class NotificationManager:
         message: str, 
         level: str = "info", 
         timeout: int = 5
-    ):
+    ) -> bool:
         """
         发送通知的内部方法
         
@@ -60,22 +70,26 @@ class NotificationManager:
             message: 通知消息
             level: 通知级别 (info, warning, critical, error)
             timeout: 显示时间（秒）
+            
+        Returns:
+            bool: 通知是否实际发出；被禁用、免打扰、去重跳过或发送失败时为 False
         """
         try:
             # 检查通知是否启用
             if not self.notification_config.enabled:
-                logger.debug(f"通知已禁用，跳过: {title}")
-                return
+                logger.debug("通知已禁用，跳过: %s", title)
+                return False
             
             # 检查免打扰时间
             if self._is_in_quiet_hours() and level not in ["critical", "error"]:
-                logger.debug(f"处于免打扰时间，跳过非紧急通知: {title}")
-                return
+                logger.debug("处于免打扰时间，跳过非紧急通知: %s", title)
+                return False
             
-            # 检查通知去重
-            if self._is_duplicate_notification(title, level):
-                logger.debug(f"重复通知，跳过: {title}")
-                return
+            # 检查通知去重（去重与记录共用同一个时间戳）
+            now = datetime.now()
+            if self._is_duplicate_notification(title, level, now):
+                logger.debug("重复通知，跳过: %s", title)
+                return False
             
             # 准备通知内容
             app_name = "Packy Usage Monitor"
@@ -84,6 +98,10 @@ class NotificationManager:
             # 选择图标
             app_icon = self._get_notification_icon(level)
             
+            # plyer 导入时会探测平台通知后端，仅在真正发送时才导入；
+            # 导入失败由下方的异常处理统一转换为提示信息
+            from plyer import notification
+            
             # 发送通知
             notification.notify(
                 title=full_title,
@@ -95,56 +113,74 @@ class NotificationManager:
             )
             
             # 记录通知历史
-            self._record_notification(title, level)
+            self._record_notification(title, level, now)
             
             logger.info(f"已发送{level}通知: {title}")
+            return True
             
         except Exception as e:
             error_msg = str(e)
 
             # 将常见的英文错误消息转换为中文
-            if "No usable implementation found" in error_msg:
-                error_msg = "通知系统不可用 (缺少必要的系统组件)"
-            elif "No module named 'plyer.platforms'" in error_msg:
-                error_msg = "通知库模块缺失 (plyer.platforms)"
-            elif "Permission denied" in error_msg:
-                error_msg = "通知权限被拒绝"
-            elif "timeout" in error_msg.lower():
-                error_msg = "通知发送超时"
+            for needle, translated in _ERR_MAP:
+                if needle in error_msg:
+                    error_msg = translated
+                    break
             else:
-                error_msg = f"通知系统错误: {error_msg}"
+                if "timeout" in error_msg.lower():
+                    error_msg = "通知发送超时"
+                else:
+                    error_msg = f"通知系统错误: {error_msg}"
 
             logger.error(f"发送通知失败: {error_msg}")
             # 通知失败不应该影响程序运行，所以不抛出异常
+            return False
     
-    def _is_in_quiet_hours(self) -> bool:
-        """检查是否在免打扰时间内"""
+    def _parse_quiet_hours(self) -> Tuple[Optional[int], Optional[int]]:
+        """
+        解析免打扰时段配置
+        
+        Returns:
+            (开始, 结束) 距当天零点的分钟数，解析失败时为 (None, None)
+        """
         try:
-            now = datetime.now().time()
-            
-            start_str = self.notification_config.quiet_hours_start
-            end_str = self.notification_config.quiet_hours_end
-            
-            # 解析时间字符串
-            start_time = datetime.strptime(start_str, "%H:%M").time()
-            end_time = datetime.strptime(end_str, "%H:%M").time()
-            
-            # 处理跨天情况（如22:00-08:00）
-            if start_time <= end_time:
-                # 同一天内的时间段
-                return start_time <= now <= end_time
-            else:
-                # 跨天的时间段
-                return now >= start_time or now <= end_time
-                
-        except Exception as e:
+            start_time = datetime.strptime(self.notification_config.quiet_hours_start, "%H:%M")
+            end_time = datetime.strptime(self.notification_config.quiet_hours_end, "%H:%M")
+        except (TypeError, ValueError) as e:
             logger.debug(f"解析免打扰时间失败: {e}")
+            return None, None
+        return (start_time.hour * 60 + start_time.minute,
+                end_time.hour * 60 + end_time.minute)
+    
+    def _is_in_quiet_hours(self) -> bool:
+        """检查是否在免打扰时间内（按分钟判断）"""
+        start, end = self._qh_start, self._qh_end
+        if start is None:
             return False
+        
+        now = datetime.now()
+        bucket = now.hour * 60 + now.minute
+        cached_bucket, cached_answer = self._qh_cache
+        if bucket == cached_bucket:
+            return cached_answer
+        
+        # 处理跨天情况（如22:00-08:00）
+        if start <= end:
+            # 同一天内的时间段
+            answer = start <= bucket <= end
+        else:
+            # 跨天的时间段
+            answer = bucket >= start or bucket <= end
+        
+        self._qh_cache = (bucket, answer)
+        return answer
     
-    def _is_duplicate_notification(self, title: str, level: str) -> bool:
+    def _is_duplicate_notification(self, title: str, level: str,
+                                   now: Optional[datetime] = None) -> bool:
         """检查是否为重复通知"""
         key = f"{level}:{title}"
-        now = datetime.now()
+        if now is None:
+            now = datetime.now()
         
         if key in self.recent_notifications:
             last_sent = self.recent_notifications[key]
@@ -153,17 +189,24 @@ class NotificationManager:
         
         return False
     
-    def _record_notification(self, title: str, level: str):
+    def _record_notification(self, title: str, level: str,
+                             now: Optional[datetime] = None):
         """记录通知历史"""
         key = f"{level}:{title}"
-        self.recent_notifications[key] = datetime.now()
+        if now is None:
+            now = datetime.now()
+        recent = self.recent_notifications
+        # 重新插入到末尾，保持按时间排序
+        recent.pop(key, None)
+        recent[key] = now
         
-        # 清理过期记录
-        cutoff_time = datetime.now() - self.notification_cooldown
-        self.recent_notifications = {
-            k: v for k, v in self.recent_notifications.items()
-            if v > cutoff_time
-        }
+        # 清理过期记录：只需从最早的一端弹出
+        cutoff_time = now - self.notification_cooldown
+        while recent:
+            oldest_key = next(iter(recent))
+            if recent[oldest_key] > cutoff_time:
+                break
+            del recent[oldest_key]
     
     def _get_notification_icon(self, level: str) -> Optional[str]:
         """获取通知图标路径"""
@@ -187,6 +230,8 @@ class NotificationManager:
         """设置静默模式"""
         self.config.update_config("notification", {"enabled": not enabled})
         self.notification_config = self.config.get_notification_config()
+        self._qh_start, self._qh_end = self._parse_quiet_hours()
+        self._qh_cache = (-1, False)
         
         if enabled:
             logger.info("已启用静默模式")
@@ -202,10 +247,12 @@ class NotificationManager:
         now = datetime.now()
         cutoff_time = now - timedelta(hours=1)  # 最近1小时的统计
         
-        recent_count = sum(
-            1 for timestamp in self.recent_notifications.values()
-            if timestamp > cutoff_time
-        )
+        # 从最新的记录往前数，遇到超出统计窗口的即可停止
+        recent_count = 0
+        for timestamp in reversed(self.recent_notifications.values()):
+            if timestamp <= cutoff_time:
+                break
+            recent_count += 1
         
         return {
             "recent_notifications": recent_count,
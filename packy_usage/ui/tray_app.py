@@ -5,16 +5,21 @@
 """
 
 import threading
-import time
 import os
 import sys
-from typing import Optional, Callable
+import random
+import shutil
+import tempfile
+from concurrent.futures import Future, wait
+from functools import lru_cache
+from typing import Optional, Callable, Dict, Tuple
 from pathlib import Path
 
 import pystray
 from pystray import MenuItem, Menu
 from PIL import Image, ImageDraw, ImageFont
 
+from .. import __version__
 from ..core.budget_data import BudgetData
 from ..core.api_client import ApiClient
 from ..core.performance import PerformanceOptimizer
@@ -26,6 +31,104 @@ from ..utils.exceptions import UIError
 
 logger = get_logger(__name__)
 
+# 托盘图标的所有状态
+ICON_STATUSES = ("init", "normal", "warning", "critical", "error", "no_token")
+# 不显示百分比的状态，图标与百分比无关
+STATIC_ICON_STATUSES = ("init", "error", "no_token")
+# 连续获取失败时的最大轮询间隔（秒）
+MAX_POLLING_BACKOFF = 300.0
+# 告警级别的高低顺序，只有级别升高时才发送通知
+_ALERT_RANK = {"normal": 0, "warning": 1, "critical": 2}
+
+# 托盘图标尺寸
+ICON_SIZE = (32, 32)
+# 图标绘制方式的修订号，修改绘制代码时递增，使磁盘缓存的旧图标失效
+ICON_STYLE_REVISION = 2
+
+
+@lru_cache(maxsize=None)
+def _get_icon_masks() -> Dict[str, Image.Image]:
+    """
+    各图标形状的遮罩（L 模式，255 为形状区域），首次使用时绘制一次
+    
+    形状只与尺寸有关，绘制图标时用颜色按遮罩粘贴一次即可，无需重复多次绘制操作
+    """
+    w, h = ICON_SIZE
+    cx, cy = w // 2, h // 2
+    masks = {}
+    
+    def new_mask(name):
+        mask = Image.new('L', ICON_SIZE, 0)
+        masks[name] = mask
+        return ImageDraw.Draw(mask)
+    
+    # 圆形图标
+    draw = new_mask("circle")
+    margin = 4
+    draw.ellipse([margin, margin, w - margin, h - margin], fill=255)
+    
+    # 简化的钥匙形状：圆形部分 + 钥匙柄部分
+    draw = new_mask("key")
+    r = 8
+    draw.ellipse([cx - r, cy - r - 4, cx + r, cy + r - 4], outline=255, width=3)
+    draw.rectangle([cx, cy + 2, cx + 10, cy + 6], fill=255)
+    draw.rectangle([cx + 6, cy + 6, cx + 10, cy + 10], fill=255)
+    
+    # X形状
+    draw = new_mask("error")
+    margin = 8
+    draw.line([margin, margin, w - margin, h - margin], fill=255, width=4)
+    draw.line([w - margin, margin, margin, h - margin], fill=255, width=4)
+    
+    # 简单的点图标
+    draw = new_mask("loading")
+    r = 4
+    draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=255)
+    
+    return masks
+
+
+# 状态颜色映射（预先解析为 RGBA 元组，PIL 无需每次解析十六进制字符串）
+_STATUS_COLORS = {
+    "init": (0x80, 0x80, 0x80, 255),      # 灰色
+    "normal": (0x00, 0xAA, 0x00, 255),    # 绿色
+    "warning": (0xFF, 0xAA, 0x00, 255),   # 黄色
+    "critical": (0xFF, 0x00, 0x00, 255),  # 红色
+    "error": (0xAA, 0x00, 0x00, 255),     # 深红色
+    "no_token": (0x40, 0x40, 0x40, 255),  # 深灰色
+}
+
+# 各状态的图标形状，其余状态为圆形并显示百分比
+_STATUS_SHAPES = {
+    "no_token": "key",      # 钥匙图标（表示需要Token）
+    "error": "error",       # 错误图标
+    "init": "loading",      # 初始化图标
+}
+
+
+@lru_cache(maxsize=None)
+def _get_base_icon(shape: str, color: Tuple[int, int, int, int]) -> Image.Image:
+    """按形状和颜色绘制的底图（只读），创建图标时复制后再绘制文字"""
+    image = Image.new('RGBA', ICON_SIZE, (0, 0, 0, 0))
+    image.paste(color, mask=_get_icon_masks()[shape])
+    return image
+
+
+@lru_cache(maxsize=4)
+def _get_font(size: int) -> ImageFont.ImageFont:
+    """按字号加载百分比文字使用的字体，每个进程每种字号只查找一次"""
+    try:
+        # Windows/Linux
+        return ImageFont.truetype("arial.ttf", size)
+    except OSError:
+        pass
+    try:
+        # macOS
+        return ImageFont.truetype("Helvetica.ttc", size)
+    except OSError:
+        # 使用默认字体
+        return ImageFont.load_default()
+
 
 class TrayApp:
     """系统托盘应用 - 集成性能优化"""
@@ -36,17 +139,40 @@ class TrayApp:
         self.api_client = api_client
         self.notification_manager = NotificationManager(config)
         
+        # 图标磁盘缓存目录，按版本和绘制修订号区分，绘制方式变化后不会读到旧图标
+        self._icon_dir = config.config_dir / ".icons" / f"{__version__}-r{ICON_STYLE_REVISION}"
+        # 图标缓存未命中时的创建函数，只绑定一次，避免每次查找都生成新的绑定方法对象
+        self._icon_factory = self._load_or_create_icon
+        
         # 性能优化器
         self.optimizer = PerformanceOptimizer.get_instance()
         
         self.icon: Optional[pystray.Icon] = None
         self.current_data: Optional[BudgetData] = None
-        self.polling_thread: Optional[threading.Thread] = None
-        self.running = False
+        self._polling_future: Optional[Future] = None
+        # 置位表示应用停止：轮询在等待期间即可被立即唤醒退出
+        self._stop_event = threading.Event()
+        # 手动刷新同一时刻只保留一个进行中的任务
+        self._refresh_lock = threading.Lock()
+        self._refresh_inflight = False
+        # 各预算已成功通知过的最高告警级别，回落到 normal 时重置
+        self._last_alert_level: Dict[str, str] = {"daily": "normal", "monthly": "normal"}
+        # 上次显示的 (状态, 整数百分比)，未变化时跳过图标更新，只刷新提示文本
+        self._last_icon_key: Optional[tuple] = None
         
         # 创建托盘图标
         self._create_tray_icon()
         
+        # 后台创建图标缓存目录并清理旧版本的目录，再预渲染所有状态和百分比的图标，
+        # 之后更新图标只需查表
+        self.optimizer.thread_pool.submit(self._prepare_icon_dir)
+        self.optimizer.thread_pool.submit(
+            self.optimizer.icon_cache.prewarm,
+            self._icon_factory,
+            ICON_STATUSES,
+            STATIC_ICON_STATUSES
+        )
+        
         # 启动批量更新管理器
         self.optimizer.batch_manager.start(self._batch_update_handler)
     
@@ -57,14 +183,14 @@ class TrayApp:
                 self._show_no_token_icon()
                 logger.warning("未找到有效Token，托盘应用以受限模式启动")
             
-            self.running = True
+            self._stop_event.clear()
             
             # 启动数据轮询线程
             if self.config.is_polling_enabled():
                 self._start_polling()
             
-            # 初始数据获取
-            self._update_data()
+            # 初始数据获取：在线程池中进行，托盘图标无需等待网络请求即可显示
+            self.optimizer.thread_pool.submit(self._update_data)
             
             # 运行托盘图标
             self.icon.run()
@@ -76,15 +202,15 @@ class TrayApp:
     def stop(self):
         """停止托盘应用"""
         logger.info("正在停止托盘应用...")
-        self.running = False
+        self._stop_event.set()
 
         try:
-            # 停止轮询线程（更短的超时时间）
-            if self.polling_thread and self.polling_thread.is_alive():
+            # 停止轮询任务：等待中的轮询会被事件立即唤醒，只需等待进行中的请求
+            if self._polling_future and not self._polling_future.done():
                 logger.debug("正在停止轮询线程...")
-                self.polling_thread.join(timeout=1)  # 减少超时时间
-                if self.polling_thread.is_alive():
-                    logger.warning("轮询线程停止超时，将被强制终止")
+                _, not_done = wait([self._polling_future], timeout=1)
+                if not_done:
+                    logger.warning("轮询任务未在 1 秒内结束，不再等待进行中的请求")
 
             # 停止批量更新管理器
             try:
@@ -93,10 +219,11 @@ class TrayApp:
             except Exception as e:
                 logger.warning(f"停止批量更新管理器失败: {e}")
 
-            # 关闭性能优化器
+            # 关闭性能优化器：不等待线程池，进行中的请求、预渲染和图标写入不会阻塞退出，
+            # 排队中的任务直接取消（图标以临时文件原子写入，中断不会留下损坏的缓存）
             try:
                 logger.debug("正在关闭性能优化器...")
-                self.optimizer.shutdown()
+                self.optimizer.shutdown(wait=False)
             except Exception as e:
                 logger.warning(f"关闭性能优化器失败: {e}")
 
@@ -155,105 +282,88 @@ class TrayApp:
             status: 状态 (init, normal, warning, critical, error, no_token)
             percentage: 使用百分比（用于显示数字）
         """
-        # 使用图标缓存
-        return self.optimizer.icon_cache.get_icon(
-            status, percentage, 
-            lambda s, p: self._create_icon_internal(s, p)
-        )
+        # 图标上只显示整数百分比：先取整再查缓存，同一整数的不同小数共用一个图标；
+        # 超过 100% 的图标不显示数字，限制到 0-100 后都命中预渲染表中的同一项
+        pct_bucket = min(max(int(percentage), 0), 100)
+        return self.optimizer.icon_cache.get_icon(status, pct_bucket, self._icon_factory)
     
-    def _create_icon_internal(self, status: str, percentage: float) -> Image.Image:
-        """内部图标创建函数"""
-        # 图标尺寸 
-        size = (32, 32)
-        
-        # 创建图像
-        image = Image.new('RGBA', size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(image)
-        
-        # 状态颜色映射
-        colors = {
-            "init": "#808080",      # 灰色
-            "normal": "#00AA00",    # 绿色
-            "warning": "#FFAA00",   # 黄色
-            "critical": "#FF0000",  # 红色
-            "error": "#AA0000",     # 深红色
-            "no_token": "#404040"   # 深灰色
-        }
-        
-        color = colors.get(status, colors["normal"])
-        
-        if status == "no_token":
-            # 显示钥匙图标
-            self._draw_key_icon(draw, size, color)
-        elif status == "error":
-            # 显示错误图标
-            self._draw_error_icon(draw, size, color)
-        elif status == "init":
-            # 显示初始化图标
-            self._draw_loading_icon(draw, size, color)
-        else:
-            # 显示圆形图标
-            self._draw_circle_icon(draw, size, color)
-            
-            # 如果有百分比数据，显示数字
-            if percentage > 0 and percentage <= 99:
-                self._draw_percentage_text(draw, size, f"{int(percentage)}")
+    def _prepare_icon_dir(self):
+        """创建当前版本的图标缓存目录，并删除其他版本或绘制修订号留下的目录"""
+        try:
+            self._icon_dir.mkdir(parents=True, exist_ok=True)
+            for entry in self._icon_dir.parent.iterdir():
+                if entry.is_dir() and entry.name != self._icon_dir.name:
+                    shutil.rmtree(entry, ignore_errors=True)
+                    logger.debug("已删除旧的图标缓存目录: %s", entry)
+        except OSError as e:
+            logger.debug("准备图标缓存目录失败: %s", e)
+    
+    def _disk_icon_path(self, status: str, percentage: int) -> Path:
+        """图标在磁盘缓存中的路径"""
+        if status in STATIC_ICON_STATUSES:
+            percentage = 0
+        return self._icon_dir / f"{status}_{percentage}.png"
+    
+    def _load_or_create_icon(self, status: str, percentage: float) -> Image.Image:
+        """
+        从磁盘缓存加载图标，不存在时绘制并写入缓存
+        
+        图标在多次启动之间复用，启动时无需重新绘制；缓存读写失败时退回直接绘制
+        """
+        path = self._disk_icon_path(status, int(percentage))
+        try:
+            with Image.open(path) as cached:
+                return cached.copy()
+        except (OSError, ValueError):
+            pass
+        
+        image = self._create_icon_internal(status, percentage)
+        
+        # PNG 压缩和写文件交给线程池，调用方拿到图标即可返回；
+        # 退出时未完成的写入会被丢弃，下次启动缺失的图标重新绘制即可
+        try:
+            self.optimizer.thread_pool.submit(self._save_icon_to_disk, image, path)
+        except RuntimeError:
+            logger.debug("线程池已关闭，跳过写入图标缓存")
         
         return image
     
-    def _draw_circle_icon(self, draw: ImageDraw.Draw, size: tuple, color: str):
-        """绘制圆形图标"""
-        margin = 4
-        draw.ellipse([margin, margin, size[0] - margin, size[1] - margin], fill=color)
+    def _save_icon_to_disk(self, image: Image.Image, path: Path):
+        """将图标写入磁盘缓存（先写临时文件再替换，并发写入同一图标时不会留下不完整的文件）"""
+        try:
+            self._icon_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self._icon_dir, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    image.save(f, 'PNG', optimize=True)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            logger.debug("写入图标缓存失败: %s", e)
     
-    def _draw_key_icon(self, draw: ImageDraw.Draw, size: tuple, color: str):
-        """绘制钥匙图标（表示需要Token）"""
-        # 简化的钥匙形状
-        w, h = size
-        cx, cy = w // 2, h // 2
+    def _create_icon_internal(self, status: str, percentage: float) -> Image.Image:
+        """内部图标创建函数"""
+        # 图标尺寸 
+        size = ICON_SIZE
         
-        # 钥匙圆形部分
-        r = 8
-        draw.ellipse([cx - r, cy - r - 4, cx + r, cy + r - 4], outline=color, width=3)
+        color = _STATUS_COLORS.get(status, _STATUS_COLORS["normal"])
+        shape = _STATUS_SHAPES.get(status, "circle")
         
-        # 钥匙柄部分
-        draw.rectangle([cx, cy + 2, cx + 10, cy + 6], fill=color)
-        draw.rectangle([cx + 6, cy + 6, cx + 10, cy + 10], fill=color)
-    
-    def _draw_error_icon(self, draw: ImageDraw.Draw, size: tuple, color: str):
-        """绘制错误图标"""
-        w, h = size
-        cx, cy = w // 2, h // 2
+        # 复制缓存的底图，代替每次新建图像再按遮罩上色
+        image = _get_base_icon(shape, color).copy()
         
-        # X形状
-        margin = 8
-        draw.line([margin, margin, w - margin, h - margin], fill=color, width=4)
-        draw.line([w - margin, margin, margin, h - margin], fill=color, width=4)
-    
-    def _draw_loading_icon(self, draw: ImageDraw.Draw, size: tuple, color: str):
-        """绘制加载图标"""
-        w, h = size
-        cx, cy = w // 2, h // 2
+        # 圆形图标：如果有百分比数据，显示数字
+        if shape == "circle" and percentage > 0 and percentage <= 99:
+            self._draw_percentage_text(ImageDraw.Draw(image), size, f"{int(percentage)}")
         
-        # 简单的点图标
-        r = 4
-        draw.ellipse([cx - r, cy - r, cx + r, cy + r], fill=color)
+        return image
     
     def _draw_percentage_text(self, draw: ImageDraw.Draw, size: tuple, text: str):
         """在图标上绘制百分比文字"""
         try:
-            # 尝试使用系统字体，如果失败则跳过文字
-            font_size = 10
-            try:
-                # Windows/Linux
-                font = ImageFont.truetype("arial.ttf", font_size)
-            except:
-                try:
-                    # macOS
-                    font = ImageFont.truetype("Helvetica.ttc", font_size)
-                except:
-                    # 使用默认字体
-                    font = ImageFont.load_default()
+            font = _get_font(10)
             
             # 计算文字位置
             bbox = draw.textbbox((0, 0), text, font=font)
@@ -263,46 +373,69 @@ class TrayApp:
             x = (size[0] - text_w) // 2
             y = (size[1] - text_h) // 2
             
-            # 绘制文字（白色，带黑色描边）
-            for dx, dy in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-                draw.text((x + dx, y + dy), text, font=font, fill="black")
-            draw.text((x, y), text, font=font, fill="white")
+            # 绘制文字（白色，带黑色描边），描边与填充一次绘制完成
+            draw.text((x, y), text, font=font, fill="white",
+                      stroke_width=1, stroke_fill="black")
             
         except Exception as e:
-            logger.debug(f"绘制百分比文字失败: {e}")
+            logger.debug("绘制百分比文字失败: %s", e)
     
     def _start_polling(self):
         """启动轮询线程（使用线程池）"""
-        if self.polling_thread and self.polling_thread.is_alive():
+        if self._polling_future and not self._polling_future.done():
             return
         
         # 使用线程池提交轮询任务
-        future = self.optimizer.thread_pool.submit(self._polling_loop)
+        self._polling_future = self.optimizer.thread_pool.submit(self._polling_loop)
         logger.info("已启动数据轮询（使用线程池）")
     
     def _polling_loop(self):
-        """轮询循环"""
-        interval = self.config.get_polling_interval()
+        """
+        轮询循环
         
-        while self.running:
+        连续获取失败时按指数退避延长等待（上限 MAX_POLLING_BACKOFF 秒，附加 ±20% 抖动），
+        成功后恢复正常轮询间隔。轮询被禁用后循环退出，释放占用的线程池线程
+        """
+        interval = self.config.get_polling_interval()
+        max_delay = max(MAX_POLLING_BACKOFF, interval)
+        delay = interval
+        fail_count = 0
+        
+        # wait() 返回 True 表示应用已停止
+        while not self._stop_event.wait(delay):
+            if not self.config.is_polling_enabled():
+                logger.info("轮询已禁用，停止数据轮询")
+                break
+            
             try:
-                time.sleep(interval)
-                if not self.running:
-                    break
-                
-                self._update_data()
-                
+                ok = self._update_data()
             except Exception as e:
                 logger.error(f"轮询过程中发生错误: {e}")
-                time.sleep(min(interval, 60))  # 错误时等待时间不超过60秒
+                ok = False
+            
+            if ok:
+                fail_count = 0
+                delay = interval
+                continue
+            
+            backoff = interval * (2 ** fail_count)
+            if backoff < max_delay:
+                fail_count += 1
+            delay = min(max_delay, backoff) * random.uniform(0.8, 1.2)
+            logger.debug("数据获取失败，%.0f 秒后重试", delay)
     
-    def _update_data(self):
-        """更新预算数据（使用批量更新）"""
+    def _update_data(self) -> bool:
+        """
+        更新预算数据（使用批量更新）
+        
+        Returns:
+            获取失败时返回 False（未配置 Token 不算失败）
+        """
         try:
             # 检查Token
             if not self.token_manager.is_token_available():
                 self._show_no_token_icon()
-                return
+                return True
             
             # 获取数据（已经有缓存优化）
             data = self.api_client.fetch_budget_data_sync()
@@ -310,13 +443,16 @@ class TrayApp:
             if data:
                 # 添加到批量更新队列
                 self.optimizer.batch_manager.add_update(data)
-                logger.debug(f"数据更新已添加到批处理队列")
-            else:
-                self._show_error_icon("获取数据失败")
+                logger.debug("数据更新已添加到批处理队列")
+                return True
+            
+            self._show_error_icon("获取数据失败")
+            return False
                 
         except Exception as e:
             logger.error(f"更新数据失败: {e}")
             self._show_error_icon(f"错误: {e}")
+            return False
     
     def _batch_update_handler(self, data: BudgetData):
         """批量更新处理器"""
@@ -327,7 +463,7 @@ class TrayApp:
             # 检查是否需要发送通知
             self._check_and_send_notification(data)
             
-            logger.debug(f"批量更新完成: 日使用率={data.daily.percentage:.1f}%")
+            logger.debug("批量更新完成: 日使用率=%.1f%%", data.daily.percentage)
         except Exception as e:
             logger.error(f"批量更新处理失败: {e}")
     
@@ -343,72 +479,100 @@ class TrayApp:
         else:
             status = "normal"
         
-        # 更新图标
-        self.icon.icon = self._create_icon_image(status, max_percentage)
+        # pystray 没有合并更新的接口：先设置标题（仅字符串），最后设置图标以触发重绘；
+        # 标题只在文本变化时才提交给系统托盘（通常只有更新时间变化）
+        self.icon.title = self._create_tooltip(data)
         
-        # 更新工具提示
-        tooltip = self._create_tooltip(data)
-        self.icon.title = tooltip
+        # 状态和整数百分比未变化时图标不变，跳过查找和赋值
+        key = (status, int(max_percentage))
+        if key == self._last_icon_key:
+            return
+        self._set_icon_image(self._create_icon_image(status, max_percentage))
+        self._last_icon_key = key
+    
+    def _set_icon_image(self, image: Image.Image):
+        """
+        设置托盘图标图像
+        
+        图标来自缓存，相同状态和百分比返回同一个对象；pystray 每次赋值都会重新
+        提交图标给系统托盘，因此仅在图标实际变化时赋值
+        """
+        if self.icon.icon is not image:
+            self.icon.icon = image
     
     def _create_tooltip(self, data: BudgetData) -> str:
         """创建工具提示文本"""
         daily = data.daily
         monthly = data.monthly
         
-        tooltip_parts = [
-            "Packy 使用监视器",
-            "",
-            f"日预算: {daily.percentage:.1f}% (${daily.used:.2f}/${daily.total:.2f})",
-            f"月预算: {monthly.percentage:.1f}% (${monthly.used:.2f}/${monthly.total:.2f})",
-        ]
+        tooltip = (
+            "Packy 使用监视器\n\n"
+            f"日预算: {daily.percentage:.1f}% (${daily.used:.2f}/${daily.total:.2f})\n"
+            f"月预算: {monthly.percentage:.1f}% (${monthly.used:.2f}/${monthly.total:.2f})"
+        )
         
-        if data.overall_status in ["warning", "critical"]:
-            tooltip_parts.append("")
-            tooltip_parts.append(f"⚠️ 状态: {data.overall_status.title()}")
+        if data.overall_status in ("warning", "critical"):
+            tooltip += f"\n\n⚠️ 状态: {data.overall_status.title()}"
         
         if data.last_updated:
-            update_time = data.last_updated.strftime("%H:%M:%S")
-            tooltip_parts.append(f"更新时间: {update_time}")
+            tooltip += f"\n更新时间: {data.last_updated:%H:%M:%S}"
         
-        return "\n".join(tooltip_parts)
+        return tooltip
     
     def _show_no_token_icon(self):
         """显示无Token状态"""
-        self.icon.icon = self._create_icon_image("no_token")
+        self._last_icon_key = None
+        self._set_icon_image(self._create_icon_image("no_token"))
         self.icon.title = "Packy 使用监视器 - 需要 Token\n右键点击进行配置"
     
     def _show_error_icon(self, message: str):
         """显示错误状态"""
-        self.icon.icon = self._create_icon_image("error")
+        self._last_icon_key = None
+        self._set_icon_image(self._create_icon_image("error"))
         self.icon.title = f"Packy 使用监视器 - {message}\n右键点击刷新"
     
     def _check_and_send_notification(self, data: BudgetData):
-        """检查并发送通知"""
+        """
+        检查并发送通知
+        
+        每次轮询都会调用；仅当某项预算的告警级别高于已通知过的级别时才发送，
+        使用率持续高于阈值或从 critical 回落到 warning 时不会重复通知。
+        只有通知实际发出后才记录级别，被免打扰、去重等跳过时下次轮询会重试；
+        回落到 warning 阈值以下后重置，再次超过会重新通知
+        """
         alert_config = self.config.get_alert_config()
         
-        # 检查日预算
-        if data.daily.percentage >= alert_config.daily_critical:
-            self.notification_manager.send_critical_alert(
-                "日预算严重警告",
-                f"日预算使用量已达到 {data.daily.percentage:.1f}% (${data.daily.used:.2f}/${data.daily.total:.2f})"
-            )
-        elif data.daily.percentage >= alert_config.daily_warning:
-            self.notification_manager.send_warning_alert(
-                "日预算警告",
-                f"日预算使用量为 {data.daily.percentage:.1f}% (${data.daily.used:.2f}/${data.daily.total:.2f})"
-            )
-        
-        # 检查月预算
-        if data.monthly.percentage >= alert_config.monthly_critical:
-            self.notification_manager.send_critical_alert(
-                "月预算严重警告",
-                f"月预算使用量已达到 {data.monthly.percentage:.1f}% (${data.monthly.used:.2f}/${data.monthly.total:.2f})"
-            )
-        elif data.monthly.percentage >= alert_config.monthly_warning:
-            self.notification_manager.send_warning_alert(
-                "月预算警告",
-                f"月预算使用量为 {data.monthly.percentage:.1f}% (${data.monthly.used:.2f}/${data.monthly.total:.2f})"
-            )
+        checks = (
+            ("daily", "日预算", data.daily, alert_config.daily_warning, alert_config.daily_critical),
+            ("monthly", "月预算", data.monthly, alert_config.monthly_warning, alert_config.monthly_critical),
+        )
+        
+        for metric, label, budget, warning, critical in checks:
+            if budget.percentage >= critical:
+                level = "critical"
+            elif budget.percentage >= warning:
+                level = "warning"
+            else:
+                level = "normal"
+            
+            if level == "normal":
+                self._last_alert_level[metric] = level
+                continue
+            if _ALERT_RANK[level] <= _ALERT_RANK[self._last_alert_level[metric]]:
+                continue
+            
+            if level == "critical":
+                sent = self.notification_manager.send_critical_alert(
+                    f"{label}严重警告",
+                    f"{label}使用量已达到 {budget.percentage:.1f}% (${budget.used:.2f}/${budget.total:.2f})"
+                )
+            else:
+                sent = self.notification_manager.send_warning_alert(
+                    f"{label}警告",
+                    f"{label}使用量为 {budget.percentage:.1f}% (${budget.used:.2f}/${budget.total:.2f})"
+                )
+            if sent:
+                self._last_alert_level[metric] = level
     
     # 菜单事件处理器
     def _show_details(self, icon, item):
@@ -432,13 +596,32 @@ class TrayApp:
     
     def _refresh_data(self, icon, item):
         """刷新数据（使用线程池）"""
-        # 清空缓存以获取最新数据
-        self.api_client.clear_cache()
+        # 已有刷新在进行时忽略重复点击
+        with self._refresh_lock:
+            if self._refresh_inflight:
+                logger.debug("刷新进行中，忽略重复请求")
+                return
+            self._refresh_inflight = True
         
-        # 使用线程池提交更新任务
-        self.optimizer.thread_pool.submit(self._update_data)
+        try:
+            # 使用线程池提交更新任务
+            self.optimizer.thread_pool.submit(self._run_refresh)
+        except Exception:
+            with self._refresh_lock:
+                self._refresh_inflight = False
+            raise
         self.notification_manager.send_info("刷新", "正在刷新预算数据...")
     
+    def _run_refresh(self):
+        """执行一次手动刷新，完成后允许下一次刷新"""
+        try:
+            # 清空缓存以获取最新数据
+            self.api_client.clear_cache()
+            self._update_data()
+        finally:
+            with self._refresh_lock:
+                self._refresh_inflight = False
+    
     def _configure_token(self, icon, item):
         """配置Token（打开配置提示）"""
         message = """配置 API Token:
@@ -513,14 +696,11 @@ Token: {'已配置' if self.token_manager.is_token_available() else '未设置'}
                 logger.info("用户请求退出应用")
 
                 # 立即设置停止标志
-                self.running = False
+                self._stop_event.set()
 
-                # 尝试正常停止
+                # 尝试正常停止：stop() 最多等待 1 秒进行中的轮询，返回后即可退出
                 self.stop()
 
-                # 给一点时间让清理完成
-                time.sleep(0.5)
-
             except Exception as e:
                 logger.error(f"退出应用时出现错误: {e}")
             finally:
@@ -0,0 +1,34 @@
+"""
+JSON 编解码
+安装了 orjson 时使用其 C 实现，否则回退到标准库 json
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖
+    orjson = None
+
+
+def loads(data) -> Any:
+    """
+    解析 JSON
+
+    Args:
+        data: bytes 或 str
+
+    Raises:
+        ValueError: JSON 格式错误（orjson.JSONDecodeError 同为其子类）
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps_bytes(obj: Any) -> bytes:
+    """序列化为 UTF-8 编码的 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj, ensure_ascii=False).encode('utf-8')
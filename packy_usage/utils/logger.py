@@ -3,13 +3,26 @@
 """
 
 import sys
+import atexit
+import queue
 import logging
 import logging.handlers
+import threading
 from pathlib import Path
 from typing import Optional
 
 
-def setup_logger(name: str = "packy_usage", level: str = "INFO", log_file: Optional[Path] = None) -> logging.Logger:
+# 后台写日志文件的监听线程，整个进程共用一个：同一文件重复设置时复用，
+# 换文件时先停止旧的监听线程并关闭其文件，避免线程和文件句柄泄漏。
+# 各记录器的 QueueHandler 共用同一个队列，换文件后已有的记录器也写入新文件
+_log_queue: queue.Queue = queue.Queue(-1)
+_listener: Optional[logging.handlers.QueueListener] = None
+_listener_file: Optional[Path] = None
+_listener_lock = threading.Lock()
+
+
+def setup_logger(name: str = "packy_usage", level: str = "INFO", log_file: Optional[Path] = None,
+                 console: bool = False) -> logging.Logger:
     """
     设置日志记录器
     
@@ -17,6 +30,7 @@ def setup_logger(name: str = "packy_usage", level: str = "INFO", log_file: Optio
         name: 日志记录器名称
         level: 日志级别
         log_file: 日志文件路径，如果为None则只输出到控制台
+        console: 指定日志文件时是否仍然输出到控制台；未指定日志文件时总是输出到控制台
         
     Returns:
         logging.Logger: 配置好的日志记录器
@@ -36,36 +50,93 @@ def setup_logger(name: str = "packy_usage", level: str = "INFO", log_file: Optio
         datefmt='%Y-%m-%d %H:%M:%S'
     )
     
-    # 控制台处理器
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(formatter)
-    console_handler.setLevel(logging.WARNING)  # 控制台只显示警告及以上级别
-    logger.addHandler(console_handler)
+    # 控制台处理器：写入日志文件时默认不再重复输出，每条记录只经过一个处理器
+    if console or not log_file:
+        _add_console_handler(logger, formatter)
     
     # 文件处理器（如果指定了日志文件）
     if log_file:
         try:
-            # 确保日志目录存在
-            log_file.parent.mkdir(parents=True, exist_ok=True)
-            
-            # 使用轮转文件处理器
-            file_handler = logging.handlers.RotatingFileHandler(
-                log_file,
-                maxBytes=10 * 1024 * 1024,  # 10MB
-                backupCount=5,
-                encoding='utf-8'
-            )
-            file_handler.setFormatter(formatter)
-            file_handler.setLevel(getattr(logging, level.upper(), logging.INFO))
-            logger.addHandler(file_handler)
+            _start_file_logging(log_file, formatter, getattr(logging, level.upper(), logging.INFO))
+            logger.addHandler(logging.handlers.QueueHandler(_log_queue))
             
         except Exception as e:
             # 如果文件日志失败，至少保证控制台日志可用
+            if not console:
+                _add_console_handler(logger, formatter)
             logger.warning(f"无法设置文件日志: {e}")
     
     return logger
 
 
+def _start_file_logging(log_file: Path, formatter: logging.Formatter, level: int):
+    """
+    启动（或复用）把共享队列中的记录写入指定日志文件的监听线程
+    
+    文件写入交给后台监听线程，调用方线程只需把记录放入队列；退出时写完剩余记录
+    
+    Args:
+        log_file: 日志文件路径
+        formatter: 文件处理器使用的格式化器
+        level: 文件处理器的日志级别
+    """
+    global _listener, _listener_file
+    
+    log_file = log_file.resolve()
+    with _listener_lock:
+        if _listener is not None and _listener_file == log_file:
+            for handler in _listener.handlers:
+                handler.setLevel(level)
+            return
+        
+        _stop_listener_locked()
+        
+        # 确保日志目录存在
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        
+        # 使用轮转文件处理器
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file,
+            maxBytes=10 * 1024 * 1024,  # 10MB
+            backupCount=5,
+            encoding='utf-8'
+        )
+        file_handler.setFormatter(formatter)
+        file_handler.setLevel(level)
+        
+        listener = logging.handlers.QueueListener(_log_queue, file_handler, respect_handler_level=True)
+        listener.start()
+        _listener, _listener_file = listener, log_file
+        atexit.register(stop_file_logging)
+
+
+def _stop_listener_locked():
+    """停止当前的监听线程并关闭其文件处理器（调用方需持有 _listener_lock）"""
+    global _listener, _listener_file
+    
+    if _listener is None:
+        return
+    atexit.unregister(stop_file_logging)
+    _listener.stop()
+    for handler in _listener.handlers:
+        handler.close()
+    _listener, _listener_file = None, None
+
+
+def stop_file_logging():
+    """停止后台日志文件写入，写完队列中剩余的记录后关闭文件"""
+    with _listener_lock:
+        _stop_listener_locked()
+
+
+def _add_console_handler(logger: logging.Logger, formatter: logging.Formatter):
+    """添加控制台处理器，只显示警告及以上级别"""
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    console_handler.setLevel(logging.WARNING)
+    logger.addHandler(console_handler)
+
+
 def get_logger(name: str = "packy_usage") -> logging.Logger:
     """
     获取日志记录器
@@ -100,7 +100,7 @@ def test_icon_cache():
     print(f"\n4. 缓存状态:")
     print(f"   缓存大小: {stats['cache_size']}")
     print(f"   最大容量: {stats['max_size']}")
-    print(f"   TTL: {stats['ttl_minutes']}分钟")
+    print(f"   预渲染图标: {stats['prewarmed_icons']}")
 
 
 def test_thread_pool():